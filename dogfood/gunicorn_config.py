@@ -0,0 +1,77 @@
+"""
+Gunicorn configuration for dogfood.
+
+    gunicorn -c python:dogfood.gunicorn_config
+
+SERVER_WORKER_CLASS (see dogfood/settings.py) picks the worker and the
+matching app: "sync" or "gthread" serve dogfood.wsgi, "uvicorn" serves
+dogfood.asgi and is the one that can hold open the /events/ live-push
+streams.
+
+The app is preloaded in the master so workers fork with Django, the URL
+conf and templates already imported; each worker then warms its template
+cache, the recent-logs cache and its agent HTTP pool before taking
+traffic. DB connections are per thread and persist for CONN_MAX_AGE:
+the sync worker serves on the thread that warmed up, so it keeps the
+connection opened there; gthread and uvicorn open one on each request
+thread's first use.
+"""
+
+import os
+from time import monotonic
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "dogfood.settings")
+
+from django.conf import settings  # noqa: E402
+
+_config_loaded_at = monotonic()
+
+WORKER_CLASSES = {
+    "sync": ("sync", "dogfood.wsgi:application"),
+    "gthread": ("gthread", "dogfood.wsgi:application"),
+    "uvicorn": ("uvicorn_worker.UvicornWorker", "dogfood.asgi:application"),
+}
+
+if settings.SERVER_WORKER_CLASS not in WORKER_CLASSES:
+    raise ValueError(
+        f"SERVER_WORKER_CLASS must be one of {', '.join(WORKER_CLASSES)}, "
+        f"not {settings.SERVER_WORKER_CLASS!r}"
+    )
+
+worker_class, wsgi_app = WORKER_CLASSES[settings.SERVER_WORKER_CLASS]
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8002")
+workers = settings.SERVER_WORKERS
+threads = settings.SERVER_THREADS if worker_class == "gthread" else 1
+preload_app = True
+loglevel = os.getenv("GUNICORN_LOG_LEVEL", "info")
+accesslog = "-"
+errorlog = "-"
+
+
+def when_ready(server):
+    server.log.info(
+        "master ready in %.3fs (%s workers x %s, app preloaded)",
+        monotonic() - _config_loaded_at,
+        workers,
+        settings.SERVER_WORKER_CLASS,
+    )
+
+
+def pre_fork(server, worker):
+    # Anything the preload opened must not be shared with the children.
+    from django.db import connections
+
+    connections.close_all()
+
+
+def post_fork(server, worker):
+    from foodtracker.warmup import warm_worker
+
+    started = monotonic()
+    timings = warm_worker(keep_connection=worker_class == "sync")
+    server.log.info(
+        "worker %s warmed in %.3fs (%s)",
+        worker.pid,
+        monotonic() - started,
+        ", ".join(f"{name} {seconds:.3f}s" for name, seconds in timings.items()),
+    )
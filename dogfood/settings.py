@@ -52,6 +52,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "foodtracker.warmup.FirstRequestTimingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -80,6 +81,23 @@ TEMPLATES = [
 
 WSGI_APPLICATION = "dogfood.wsgi.application"
 
+# Serving (dogfood/gunicorn_config.py). SERVER_WORKER_CLASS is sync, gthread
+# or uvicorn; uvicorn serves dogfood.asgi.
+SERVER_WORKER_CLASS = os.getenv("SERVER_WORKER_CLASS", "gthread")
+SERVER_WORKERS = int(os.getenv("SERVER_WORKERS", "4"))
+SERVER_THREADS = int(os.getenv("SERVER_THREADS", "4"))
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "foodtracker": {"handlers": ["console"], "level": "INFO"},
+    },
+}
+
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
@@ -107,6 +125,53 @@ else:
         }
     }
 
+# Keep each request thread's connection open between requests instead of
+# reconnecting every time; health checks drop one the server has closed.
+# Async (uvicorn) workers don't reuse threads that way, so they reconnect.
+DATABASES["default"]["CONN_MAX_AGE"] = int(
+    os.getenv("DB_CONN_MAX_AGE", "0" if SERVER_WORKER_CLASS == "uvicorn" else "60")
+)
+DATABASES["default"]["CONN_HEALTH_CHECKS"] = True
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+#
+# locmem is per-process, so anything that needs to be shared between gunicorn
+# workers (e.g. agent call coalescing) wants the db backend, which needs
+# `python manage.py createcachetable`. Its add() is an INSERT on the key's
+# primary key, so exactly one worker wins a lock. The file backend shares
+# values too, but its add() is check-then-set: two workers can both "win".
+
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "locmem")
+
+if CACHE_BACKEND == "db":
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+            "LOCATION": os.getenv("CACHE_LOCATION", "django_cache"),
+        }
+    }
+elif CACHE_BACKEND == "file":
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": os.getenv("CACHE_LOCATION", str(BASE_DIR / ".cache")),
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
+# The recent-logs window is kept current by the insert/update/delete hooks;
+# the TTL only bounds staleness from writes that bypass them (raw SQL,
+# another app). With the per-process locmem backend other workers' writes
+# are never seen, so there the window only lives RECENT_LOGS_LOCAL_CACHE_TTL_S.
+RECENT_LOGS_CACHE_TTL_S = int(os.getenv("RECENT_LOGS_CACHE_TTL_S", "3600"))
+RECENT_LOGS_LOCAL_CACHE_TTL_S = int(os.getenv("RECENT_LOGS_LOCAL_CACHE_TTL_S", "5"))
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -142,6 +207,18 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/5.2/howto/static-files/
 
 STATIC_URL = "static/"
+STATIC_ROOT = BASE_DIR / "staticfiles"
+
+# collectstatic writes content-hashed names plus .gz/.br copies, which
+# foodtracker.static_serving serves with far-future cache headers.
+STORAGES = {
+    "default": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+    },
+    "staticfiles": {
+        "BACKEND": "foodtracker.storage.CompressedManifestStaticFilesStorage",
+    },
+}
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
@@ -149,4 +226,48 @@ STATIC_URL = "static/"
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 AGENT_ENDPOINT = os.getenv("AGENT_ENDPOINT", "")
+# Comma-separated list of agent hosts to hedge across; falls back to
+# AGENT_ENDPOINT. A backup request goes to the next endpoint once the primary
+# is slower than its recent p95 (AGENT_HEDGE_DELAY_S until we have samples).
+AGENT_ENDPOINTS = [
+    endpoint.strip()
+    for endpoint in os.getenv("AGENT_ENDPOINTS", "").split(",")
+    if endpoint.strip()
+]
+AGENT_TIMEOUT_S = float(os.getenv("AGENT_TIMEOUT_S", "10"))
+AGENT_HEDGE_DELAY_S = float(os.getenv("AGENT_HEDGE_DELAY_S", "1.0"))
+# Append-only JSON-lines record of every agent call (prompt hash and size,
+# latency, status), replayable with `manage.py replay_agent_journal`.
+# Set to an empty string to turn it off.
+AGENT_JOURNAL_PATH = os.getenv(
+    "AGENT_JOURNAL_PATH", str(BASE_DIR / "agent_journal.jsonl")
+)
 AGENT_ACCESS_KEY = os.getenv("django_dog_food_access_key")
+
+# Concurrent requests for the same prompt share a single agent call. The first
+# request holds the lock for at most AGENT_COALESCE_LOCK_S, the others wait up
+# to AGENT_COALESCE_WAIT_S for its result, which is reused for
+# AGENT_COALESCE_RESULT_TTL_S.
+AGENT_COALESCE_LOCK_S = float(os.getenv("AGENT_COALESCE_LOCK_S", "15"))
+AGENT_COALESCE_WAIT_S = float(os.getenv("AGENT_COALESCE_WAIT_S", "10"))
+AGENT_COALESCE_RESULT_TTL_S = float(os.getenv("AGENT_COALESCE_RESULT_TTL_S", "60"))
+
+# The page waits at most AGENT_LATENCY_BUDGET_S for an agent call to get
+# started; calls that would queue past it are shed and the page falls back.
+# AGENT_RATE_PER_S/AGENT_RATE_BURST is a token bucket per worker process,
+# AGENT_MAX_IN_FLIGHT is shared by all workers through the cache (one key per
+# slot, held for at most AGENT_SLOT_TTL_S if a worker dies mid-call).
+AGENT_LATENCY_BUDGET_S = float(os.getenv("AGENT_LATENCY_BUDGET_S", "0.8"))
+AGENT_RATE_PER_S = float(os.getenv("AGENT_RATE_PER_S", "2"))
+AGENT_RATE_BURST = int(os.getenv("AGENT_RATE_BURST", "5"))
+AGENT_MAX_IN_FLIGHT = int(os.getenv("AGENT_MAX_IN_FLIGHT", "4"))
+AGENT_QUEUE_SIZE = int(os.getenv("AGENT_QUEUE_SIZE", "8"))
+AGENT_SLOT_TTL_S = float(os.getenv("AGENT_SLOT_TTL_S", "60"))
+
+# Live push of new rows (/events/, served over ASGI). Each stream lives for
+# FOODLOG_EVENTS_MAX_S before the browser reconnects, checks the cache feed
+# version every FOODLOG_EVENTS_POLL_S and the table every
+# FOODLOG_EVENTS_DB_POLL_S regardless.
+FOODLOG_EVENTS_MAX_S = float(os.getenv("FOODLOG_EVENTS_MAX_S", "300"))
+FOODLOG_EVENTS_POLL_S = float(os.getenv("FOODLOG_EVENTS_POLL_S", "1"))
+FOODLOG_EVENTS_DB_POLL_S = float(os.getenv("FOODLOG_EVENTS_DB_POLL_S", "15"))
@@ -15,10 +15,14 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 
+from django.conf import settings
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
+
+from foodtracker.static_serving import serve_static
 
 urlpatterns = [
     path("", include("foodtracker.urls")),
     path("admin/", admin.site.urls),
+    re_path(rf"^{settings.STATIC_URL.strip('/')}/(?P<path>.+)$", serve_static),
 ]
@@ -1,3 +1,161 @@
 from django.contrib import admin
+from django.core.paginator import Paginator
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils.functional import cached_property
 
-# Register your models here.
+from foodtracker.models import PACIFIC_TZ, FoodLog
+from foodtracker.recent_logs import invalidate_recent_logs
+
+# Above this many rows an unfiltered changelist shows the planner's estimate
+# instead of running COUNT(*); filtered changelists count at most this many.
+COUNT_CAP = 10_000
+
+# Rows per transaction for the bulk actions.
+BATCH_SIZE = 1_000
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that never runs an exact COUNT(*) over a big table.
+
+    On PostgreSQL an unfiltered queryset uses pg_class.reltuples (kept fresh
+    by autovacuum). Everything else counts through a LIMIT, so the cost is
+    bounded by COUNT_CAP and pages past it are reached via the date
+    hierarchy instead.
+    """
+
+    @cached_property
+    def count(self) -> int:
+        query = self.object_list.query
+        if connection.vendor == "postgresql" and not query.where:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT reltuples::bigint FROM pg_class WHERE relname = %s",
+                    [self.object_list.model._meta.db_table],
+                )
+                row = cursor.fetchone()
+            if row and row[0] > COUNT_CAP:
+                return row[0]
+        return self.object_list[:COUNT_CAP].count()
+
+
+def _keyset_rows(queryset):
+    """
+    (id, feeddatetime, food_qty, water_qty, teeth_brush) for the queryset in
+    (feeddatetime, id) order, fetched BATCH_SIZE rows at a time by seeking
+    past the last row seen. That walks foodlog_feeddt_id_idx and is safe
+    while earlier rows are being rewritten or deleted.
+    """
+    ordered = queryset.order_by("feeddatetime", "id").values_list(
+        "id", "feeddatetime", "food_qty", "water_qty", "teeth_brush"
+    )
+    page = ordered
+    while True:
+        batch = list(page[:BATCH_SIZE])
+        yield from batch
+        if len(batch) < BATCH_SIZE:
+            return
+        last_id, last_dt = batch[-1][0], batch[-1][1]
+        page = ordered.filter(
+            Q(feeddatetime__gt=last_dt) | Q(feeddatetime=last_dt, id__gt=last_id)
+        )
+
+
+@admin.register(FoodLog)
+class FoodLogAdmin(admin.ModelAdmin):
+    list_display = ("id", "feeddatetime", "food_qty", "water_qty", "teeth_brush")
+    date_hierarchy = "feeddatetime"
+    # Matches foodlog_feeddt_id_idx, and -id makes the order total so
+    # pages are stable.
+    ordering = ("-feeddatetime", "-id")
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    list_per_page = 100
+    list_max_show_all = 500
+    actions = ["rollup_by_day", "delete_in_batches"]
+
+    def get_actions(self, request):
+        # The stock delete_selected loads every selected object to build its
+        # confirmation page; delete_in_batches replaces it.
+        actions = super().get_actions(request)
+        actions.pop("delete_selected", None)
+        return actions
+
+    @admin.action(
+        description="Roll up selected logs into one entry per PT day",
+        permissions=["change", "delete"],
+    )
+    def rollup_by_day(self, request, queryset):
+        """
+        Merge each PT day's selected rows into that day's earliest row:
+        quantities are summed and teeth_brush is kept if any row had it.
+        Rows are read with _keyset_rows and written back roughly BATCH_SIZE
+        rows per transaction, never splitting a day.
+        """
+        keepers: list[FoodLog] = []
+        doomed_ids: list[int] = []
+        merged_rows = days = 0
+        current_day = None
+
+        def flush():
+            nonlocal merged_rows
+            if not keepers and not doomed_ids:
+                return
+            with transaction.atomic():
+                FoodLog.objects.bulk_update(
+                    keepers, ["food_qty", "water_qty", "teeth_brush"]
+                )
+                FoodLog.objects.filter(id__in=doomed_ids).delete()
+            merged_rows += len(doomed_ids)
+            keepers.clear()
+            doomed_ids.clear()
+
+        for log_id, feeddatetime, food_qty, water_qty, teeth_brush in _keyset_rows(
+            queryset
+        ):
+            pt_day = feeddatetime.astimezone(PACIFIC_TZ).date()
+            if pt_day != current_day:
+                if len(keepers) + len(doomed_ids) >= BATCH_SIZE:
+                    flush()
+                current_day = pt_day
+                days += 1
+                keepers.append(
+                    FoodLog(
+                        id=log_id,
+                        feeddatetime=feeddatetime,
+                        food_qty=food_qty,
+                        water_qty=water_qty,
+                        teeth_brush=teeth_brush,
+                    )
+                )
+                continue
+
+            keeper = keepers[-1]
+            keeper.food_qty += food_qty
+            keeper.water_qty += water_qty
+            keeper.teeth_brush = keeper.teeth_brush or teeth_brush
+            doomed_ids.append(log_id)
+
+        flush()
+        # bulk_update sends no signals, and queryset deletes don't go through
+        # FoodLog.delete()
+        invalidate_recent_logs()
+        self.message_user(
+            request, f"Rolled up {merged_rows} logs into {days} daily entries."
+        )
+
+    @admin.action(
+        description="Delete selected logs (in batches)", permissions=["delete"]
+    )
+    def delete_in_batches(self, request, queryset):
+        deleted = 0
+        while True:
+            batch = list(queryset.values_list("id", flat=True)[:BATCH_SIZE])
+            if not batch:
+                break
+            with transaction.atomic():
+                deleted += FoodLog.objects.filter(id__in=batch).delete()[0]
+        # Queryset deletes don't go through FoodLog.delete()
+        invalidate_recent_logs()
+        self.message_user(request, f"Deleted {deleted} logs.")
@@ -0,0 +1,190 @@
+import asyncio
+import os
+import statistics
+import threading
+from collections import deque
+from time import monotonic
+
+import httpx
+from django.conf import settings
+
+# Below this many samples an endpoint's p95 is noise, use AGENT_HEDGE_DELAY_S.
+MIN_SAMPLES_FOR_P95 = 10
+
+
+class EndpointLatencyTracker:
+    """
+    Recent request latencies per endpoint, process-local. Failures count as
+    a full timeout so a broken endpoint drops out of the primary slot.
+    """
+
+    def __init__(self, window: int = 100):
+        self.window = window
+        self._samples: dict[str, deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, endpoint: str, seconds: float) -> None:
+        with self._lock:
+            samples = self._samples.setdefault(endpoint, deque(maxlen=self.window))
+            samples.append(seconds)
+
+    def record_failure(self, endpoint: str) -> None:
+        self.record(endpoint, settings.AGENT_TIMEOUT_S)
+
+    def p95(self, endpoint: str) -> float | None:
+        with self._lock:
+            samples = list(self._samples.get(endpoint, ()))
+        if len(samples) < MIN_SAMPLES_FOR_P95:
+            return None
+        return statistics.quantiles(samples, n=20)[-1]
+
+    def ordered(self, endpoints: list[str]) -> list[str]:
+        """
+        Endpoints fastest (by p95) first. Endpoints without enough samples
+        sort first so they get measured; ties keep the configured order.
+        """
+        return sorted(endpoints, key=lambda endpoint: self.p95(endpoint) or 0.0)
+
+    def hedge_delay(self, endpoint: str) -> float:
+        """
+        How long to wait on `endpoint` before firing a backup request.
+        """
+        p95 = self.p95(endpoint)
+        if p95 is None:
+            return settings.AGENT_HEDGE_DELAY_S
+        return max(0.05, p95)
+
+
+class AgentTransport:
+    """
+    Owns an event loop on a daemon thread with a pooled httpx.AsyncClient, so
+    sync callers get keep-alive connections and hedged requests that can
+    really be cancelled.
+    """
+
+    def __init__(self):
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._client: httpx.AsyncClient | None = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=loop.run_forever, name="agent-http", daemon=True
+                ).start()
+                self._client = asyncio.run_coroutine_threadsafe(
+                    self._make_client(), loop
+                ).result()
+                self._loop = loop
+            return self._loop
+
+    async def _make_client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(timeout=settings.AGENT_TIMEOUT_S)
+
+    def start(self) -> None:
+        self._ensure_started()
+
+    def reset(self) -> None:
+        """
+        Forget the loop and client, e.g. in a freshly forked child where the
+        loop thread no longer exists.
+        """
+        self._loop = None
+        self._client = None
+        self._lock = threading.Lock()
+
+    async def _attempt(self, endpoint: str, path: str, payload: dict, headers: dict):
+        assert self._client is not None
+        url = f"{endpoint.rstrip('/')}{path}"
+        started = monotonic()
+        try:
+            resp = await self._client.post(url, json=payload, headers=headers)
+            resp.raise_for_status()
+        except asyncio.CancelledError:
+            # Lost to another endpoint. Its real latency is longer than this,
+            # so count at least its hedge delay, or a slow primary would only
+            # ever record its fast answers and never lose the primary slot.
+            elapsed = monotonic() - started
+            tracker.record(endpoint, max(elapsed, tracker.hedge_delay(endpoint)))
+            raise
+        except Exception:
+            tracker.record_failure(endpoint)
+            raise
+        tracker.record(endpoint, monotonic() - started)
+        return resp
+
+    async def _post_hedged(
+        self, endpoints: list[str], path: str, payload: dict, headers: dict
+    ) -> httpx.Response:
+        remaining = tracker.ordered(endpoints)
+        pending: set[asyncio.Task] = set()
+        errors: list[BaseException] = []
+        last_launched = ""
+
+        def launch_next() -> None:
+            nonlocal last_launched
+            last_launched = remaining.pop(0)
+            pending.add(
+                asyncio.create_task(
+                    self._attempt(last_launched, path, payload, headers)
+                )
+            )
+
+        launch_next()
+        try:
+            while pending:
+                timeout = tracker.hedge_delay(last_launched) if remaining else None
+                done, pending = await asyncio.wait(
+                    pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    errors.append(task.exception())
+                # Nothing back in time, or the in-flight request failed: hedge.
+                if remaining:
+                    launch_next()
+        finally:
+            for task in pending:
+                task.cancel()
+
+        raise errors[0]
+
+    def head(self, url: str, timeout: float) -> httpx.Response:
+        """
+        Plain HEAD through the pooled client, used to open a keep-alive
+        connection ahead of the first real call.
+        """
+        loop = self._ensure_started()
+        assert self._client is not None
+        return asyncio.run_coroutine_threadsafe(
+            self._client.head(url, timeout=timeout), loop
+        ).result()
+
+    def post(
+        self, endpoints: list[str], path: str, payload: dict, headers: dict
+    ) -> httpx.Response:
+        """
+        POST to the fastest endpoint, hedging to the next one if it hasn't
+        answered within its p95. Returns the first successful response and
+        cancels the rest; if every endpoint fails, raises the first error.
+        """
+        loop = self._ensure_started()
+        return asyncio.run_coroutine_threadsafe(
+            self._post_hedged(endpoints, path, payload, headers), loop
+        ).result()
+
+
+tracker = EndpointLatencyTracker()
+transport = AgentTransport()
+
+os.register_at_fork(after_in_child=transport.reset)
+
+
+def get_agent_endpoints() -> list[str]:
+    """
+    AGENT_ENDPOINTS if configured, else the single AGENT_ENDPOINT.
+    """
+    return list(settings.AGENT_ENDPOINTS) or [settings.AGENT_ENDPOINT]
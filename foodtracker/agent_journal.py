@@ -0,0 +1,126 @@
+import hashlib
+import json
+import logging
+import threading
+from collections.abc import Iterator
+from dataclasses import dataclass
+
+import httpx
+from django.conf import settings
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# The prompt's data portion is written only the first time this process sees
+# its hash; replay resolves later entries by hash. Reset once it grows past
+# this.
+MAX_SEEN_PROMPTS = 10_000
+
+_seen_prompt_hashes: set[str] = set()
+_write_lock = threading.Lock()
+
+
+@dataclass
+class JournalEntry:
+    ts: str
+    prompt_hash: str
+    prompt_bytes: int
+    latency_ms: int
+    status: str
+    response_chars: int
+    endpoint: str
+    question: str = ""
+    context: str | None = None
+
+    @property
+    def prompt(self) -> str | None:
+        if self.context is None:
+            return None
+        return self.context + self.question
+
+
+def prompt_hash(prompt: str) -> str:
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:16]
+
+
+def status_for_error(exc: BaseException) -> str:
+    """
+    Compact status for a failed call, e.g. "http_503" or "ReadTimeout".
+    """
+    if isinstance(exc, httpx.HTTPStatusError):
+        return f"http_{exc.response.status_code}"
+    return type(exc).__name__
+
+
+def record_agent_call(
+    prompt: str,
+    latency_s: float,
+    status: str,
+    response_chars: int = 0,
+    endpoint: str = "",
+    context: str = "",
+) -> None:
+    """
+    Append one line to the AGENT_JOURNAL_PATH JSON-lines journal. Each write
+    is a single O_APPEND write, so workers can share the file. Never raises:
+    losing a journal line must not fail the page.
+
+    `context` is the data portion the prompt starts with (what the
+    suggestion fingerprint hashes). Entries are keyed on it and only the
+    rest of the prompt, the question with its timestamp, goes on every line.
+    """
+    path = settings.AGENT_JOURNAL_PATH
+    if not path:
+        return
+
+    if not prompt.startswith(context):
+        context = ""
+    question = prompt[len(context) :]
+    if not context:
+        context, question = prompt, ""
+
+    digest = prompt_hash(context)
+    entry = {
+        "ts": timezone.now().isoformat(timespec="milliseconds"),
+        "prompt_hash": digest,
+        "prompt_bytes": len(prompt.encode("utf-8")),
+        "latency_ms": round(latency_s * 1000),
+        "status": status,
+        "response_chars": response_chars,
+        "endpoint": endpoint,
+        "question": question,
+    }
+
+    with _write_lock:
+        if digest not in _seen_prompt_hashes:
+            if len(_seen_prompt_hashes) >= MAX_SEEN_PROMPTS:
+                _seen_prompt_hashes.clear()
+            entry["context"] = context
+        line = json.dumps(entry, separators=(",", ":")) + "\n"
+        try:
+            with open(path, "a", encoding="utf-8") as journal:
+                journal.write(line)
+        except OSError:
+            logger.warning("could not write agent journal %s", path, exc_info=True)
+            return
+        _seen_prompt_hashes.add(digest)
+
+
+def read_journal(path: str) -> Iterator[JournalEntry]:
+    """
+    Entries in file order, with the prompt context filled in from the first
+    entry that carried it. Malformed lines (e.g. a torn final write) are
+    skipped.
+    """
+    contexts: dict[str, str] = {}
+    with open(path, encoding="utf-8") as journal:
+        for line in journal:
+            try:
+                entry = JournalEntry(**json.loads(line))
+            except (ValueError, TypeError):
+                continue
+            if entry.context is not None:
+                contexts[entry.prompt_hash] = entry.context
+            else:
+                entry.context = contexts.get(entry.prompt_hash)
+            yield entry
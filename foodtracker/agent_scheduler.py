@@ -0,0 +1,143 @@
+import threading
+import uuid
+from collections.abc import Callable
+from time import monotonic, sleep
+from typing import TypeVar
+
+from django.conf import settings
+from django.core.cache import cache
+
+T = TypeVar("T")
+
+
+def _slot_key(index: int) -> str:
+    return f"agent:slot:{index}"
+
+
+class AgentOverloaded(Exception):
+    """
+    Raised instead of queueing an agent call past the caller's deadline.
+    """
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket. Tokens may go negative: a caller that is
+    allowed to wait reserves a future token and sleeps until it is due, so
+    waiters are served in arrival order without spinning.
+    """
+
+    def __init__(self, rate_per_s: float, burst: int):
+        self.rate_per_s = rate_per_s
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, deadline: float) -> bool:
+        """
+        Take a token, sleeping until it is available. Returns False without
+        taking anything if that would be after the deadline.
+        """
+        with self._lock:
+            now = monotonic()
+            self._tokens = min(
+                float(self.burst),
+                self._tokens + (now - self._updated) * self.rate_per_s,
+            )
+            self._updated = now
+            wait_s = max(0.0, (1 - self._tokens) / self.rate_per_s)
+            if now + wait_s > deadline:
+                return False
+            self._tokens -= 1
+
+        if wait_s:
+            sleep(wait_s)
+        return True
+
+
+class AgentScheduler:
+    """
+    Gate in front of the agent:
+    - a token bucket rate limit (per worker process)
+    - a max-in-flight limit shared across workers through the Django cache:
+      one lock key per slot, taken with cache.add
+    - a bounded per-process queue of callers waiting for an in-flight slot
+
+    Anything that cannot start before its deadline is shed with
+    AgentOverloaded so the page can fall back immediately.
+    """
+
+    def __init__(
+        self, rate_per_s: float, burst: int, max_in_flight: int, queue_size: int
+    ):
+        self.bucket = TokenBucket(rate_per_s, burst)
+        self.max_in_flight = max_in_flight
+        self._queue_slots = threading.BoundedSemaphore(queue_size)
+
+    def _try_acquire_slot(self) -> tuple[str, str] | None:
+        """
+        Take a free slot, returning its key and our token. add is atomic on the locmem and
+        db backends, so each slot has one holder. The key expires after
+        AGENT_SLOT_TTL_S, so a worker killed mid-call can't keep it forever.
+        """
+        token = uuid.uuid4().hex
+        for index in range(self.max_in_flight):
+            key = _slot_key(index)
+            if cache.add(key, token, timeout=settings.AGENT_SLOT_TTL_S):
+                return key, token
+        return None
+
+    def _release_slot(self, slot: tuple[str, str]) -> None:
+        # Only free the slot if it is still ours, not re-taken after expiry.
+        key, token = slot
+        if cache.get(key) == token:
+            cache.delete(key)
+
+    def _wait_for_slot(self, deadline: float) -> tuple[str, str]:
+        slot = self._try_acquire_slot()
+        if slot is not None:
+            return slot
+
+        if not self._queue_slots.acquire(blocking=False):
+            raise AgentOverloaded("agent queue is full")
+        try:
+            poll_s = 0.02
+            while monotonic() + poll_s < deadline:
+                sleep(poll_s)
+                slot = self._try_acquire_slot()
+                if slot is not None:
+                    return slot
+                poll_s = min(poll_s * 2, 0.2)
+        finally:
+            self._queue_slots.release()
+        raise AgentOverloaded("no agent slot free before the deadline")
+
+    def call(self, fn: Callable[..., T], *args, deadline: float) -> T:
+        if not self.bucket.reserve(deadline):
+            raise AgentOverloaded("agent rate limit reached")
+        slot = self._wait_for_slot(deadline)
+        try:
+            return fn(*args)
+        finally:
+            self._release_slot(slot)
+
+
+_scheduler: AgentScheduler | None = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> AgentScheduler:
+    """
+    Process-wide scheduler, built lazily from settings.
+    """
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = AgentScheduler(
+                rate_per_s=settings.AGENT_RATE_PER_S,
+                burst=settings.AGENT_RATE_BURST,
+                max_in_flight=settings.AGENT_MAX_IN_FLIGHT,
+                queue_size=settings.AGENT_QUEUE_SIZE,
+            )
+        return _scheduler
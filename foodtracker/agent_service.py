@@ -1,18 +1,31 @@
+import hashlib
 import json
 import statistics
+import threading
 from collections import defaultdict
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from dataclasses import asdict, dataclass
 from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from time import monotonic, sleep
 from zoneinfo import ZoneInfo
 
-import httpx
 from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections
 from django.utils import timezone
 
-from foodtracker.models import FoodLog
+from foodtracker.agent_endpoints import get_agent_endpoints, transport
+from foodtracker.agent_journal import record_agent_call, status_for_error
+from foodtracker.agent_scheduler import AgentOverloaded, get_scheduler
+from foodtracker.models import AnyFoodLog
 
 PACIFIC_TZ = ZoneInfo("America/Los_Angeles")
 
+# PT hours Biscuit is usually fed at; the local estimate splits what is left
+# of a typical day across the meals still to come.
+MEAL_HOURS_PT = (7, 12, 17, 21)
+
 
 @dataclass
 class DailyFoodTotal:
@@ -27,17 +40,42 @@ class FeedingSummary:
     daily_totals_last_20_days: list[DailyFoodTotal]
 
 
-def _call_agent_with_prompt(prompt: str) -> str:
+@dataclass
+class AgentSuggestion:
     """
-    Low-level HTTP call to the agent. Mirrors the old inline logic in views.py.
-    Raises if the request fails.
+    What the page shows. `source` is "agent" or "local"; a pending local
+    suggestion means the agent call is still running and its answer can be
+    fetched later by fingerprint.
     """
-    url = f"{settings.AGENT_ENDPOINT.rstrip('/')}/api/v1/chat/completions"
-    headers = {
+
+    text: str
+    fingerprint: str
+    source: str = "agent"
+    pending: bool = False
+
+    def __str__(self) -> str:
+        return self.text
+
+
+class AgentCallPending(Exception):
+    """
+    Raised to a waiter that stops following another caller's agent call; the
+    leader will still cache the answer.
+    """
+
+
+AGENT_COMPLETIONS_PATH = "/api/v1/chat/completions"
+
+
+def _agent_headers() -> dict:
+    return {
         "Authorization": f"Bearer {settings.AGENT_ACCESS_KEY}",
         "Content-Type": "application/json",
     }
-    payload = {
+
+
+def _agent_payload(prompt: str) -> dict:
+    return {
         "messages": [{"role": "user", "content": prompt}],
         "stream": False,
         "include_functions_info": False,
@@ -45,12 +83,38 @@ def _call_agent_with_prompt(prompt: str) -> str:
         "include_guardrails_info": False,
     }
 
-    resp = httpx.post(url, json=payload, headers=headers, timeout=10.0)
-    resp.raise_for_status()
-    body = resp.json()
 
-    response = body["choices"][0]["message"]["content"]
+def _call_agent_with_prompt(prompt: str, context: str = "") -> str:
+    """
+    Low-level HTTP call to the agent, hedged across the configured endpoints.
+    Every call is recorded in the agent journal, keyed on `context` (the
+    data portion of the prompt). Raises if the request fails on every
+    endpoint.
+    """
+    started = monotonic()
+    try:
+        resp = transport.post(
+            get_agent_endpoints(),
+            AGENT_COMPLETIONS_PATH,
+            _agent_payload(prompt),
+            _agent_headers(),
+        )
+        body = resp.json()
+        response = body["choices"][0]["message"]["content"]
+    except Exception as e:
+        record_agent_call(
+            prompt, monotonic() - started, status_for_error(e), context=context
+        )
+        raise
 
+    record_agent_call(
+        prompt,
+        monotonic() - started,
+        "ok",
+        response_chars=len(response),
+        endpoint=resp.request.url.host,
+        context=context,
+    )
     return response
 
 
@@ -65,7 +129,7 @@ def _window_start_utc(now_dt: datetime) -> datetime:
     return start_of_day_pt.astimezone(dt_timezone.utc)
 
 
-def _feeding_summary_last_20_days(food_logs: list[FoodLog]) -> FeedingSummary:
+def _feeding_summary_last_20_days(food_logs: Sequence[AnyFoodLog]) -> FeedingSummary:
     """
     Summaries keyed off PT calendar days because the DB stores UTC timestamps.
     """
@@ -75,7 +139,7 @@ def _feeding_summary_last_20_days(food_logs: list[FoodLog]) -> FeedingSummary:
     for log in food_logs:
         if log.feeddatetime < window_start:
             continue
-        pt_day = timezone.localtime(log.feeddatetime, PACIFIC_TZ).date()
+        pt_day = log.feeddatetime_pt.date()
         totals_by_day[pt_day] += log.food_qty
 
     if not totals_by_day:
@@ -98,33 +162,217 @@ def _feeding_summary_last_20_days(food_logs: list[FoodLog]) -> FeedingSummary:
     )
 
 
-def _build_prompt(food_logs: list[FoodLog]) -> str:
+def _build_prompt_context(food_logs: Sequence[AnyFoodLog]) -> str:
     """
-    Build the prompt string we send to the agent.
+    The data portion of the prompt: recent entries plus the 20-day summary.
     """
-    now_pt = timezone.localtime(timezone.now(), PACIFIC_TZ).isoformat()
     recent_entries = [log.to_llm_dict() for log in food_logs]
     recent_json = json.dumps(recent_entries, separators=(",", ":"))
     feeding_summary = _feeding_summary_last_20_days(food_logs)
     feeding_summary_json = json.dumps(asdict(feeding_summary), separators=(",", ":"))
-    prompt = (
+    return (
         "Recent feeding so far is: "
         + recent_json
         + " Feeding summary for last 20 PT days: "
         + feeding_summary_json
+    )
+
+
+def _build_prompt(food_logs: Sequence[AnyFoodLog], context: str | None = None) -> str:
+    """
+    Build the prompt string we send to the agent.
+    """
+    if context is None:
+        context = _build_prompt_context(food_logs)
+    now_pt = timezone.localtime(timezone.now(), PACIFIC_TZ).isoformat()
+    return (
+        context
         + f" Given that Biscuit needs regular meals and it is currently {now_pt}, what should the next portion be?"
     )
-    # TODO - add in logging framework
-    # print(prompt)
-    return prompt
 
 
-def get_agent_suggestion(food_logs: list[FoodLog]) -> str:
+def _prompt_fingerprint(context: str) -> str:
+    """
+    Fingerprint of the prompt's data portion. The trailing "it is currently"
+    timestamp changes every microsecond, so it is left out - two page loads
+    over the same rows want the same answer.
+    """
+    return hashlib.sha256(context.encode("utf-8")).hexdigest()
+
+
+def _call_agent_coalesced(
+    prompt: str,
+    fingerprint: str,
+    deadline: float | None = None,
+    context: str = "",
+    stop_waiting_at: float | None = None,
+) -> str:
+    """
+    Single-flight wrapper around _call_agent_with_prompt, shared across
+    workers through the Django cache.
+
+    The first caller for a fingerprint takes the lock with cache.add and makes
+    the call; concurrent callers poll for its result. add is atomic on the
+    locmem and db backends. On the file backend it is check-then-set, so two
+    workers can occasionally both make the call.
+    If the leader fails its lock is released and a waiter takes over. A waiter
+    that runs out of patience makes the call itself rather than failing.
+
+    Only the caller actually making the call goes through the scheduler, with
+    `deadline` (a time.monotonic() value) bounding how long it may queue.
+    A waiter with `stop_waiting_at` raises AgentCallPending at that time
+    instead of polling on.
+    """
+    if deadline is None:
+        deadline = monotonic() + settings.AGENT_LATENCY_BUDGET_S
+    scheduler = get_scheduler()
+    result_key = f"agent:result:{fingerprint}"
+    lock_key = f"agent:lock:{fingerprint}"
+    wait_deadline = monotonic() + settings.AGENT_COALESCE_WAIT_S
+    poll_s = 0.05
+
+    while True:
+        cached = cache.get(result_key)
+        if cached is not None:
+            return cached
+
+        if cache.add(lock_key, True, timeout=settings.AGENT_COALESCE_LOCK_S):
+            try:
+                response = scheduler.call(
+                    _call_agent_with_prompt, prompt, context, deadline=deadline
+                )
+                cache.set(
+                    result_key,
+                    response,
+                    timeout=settings.AGENT_COALESCE_RESULT_TTL_S,
+                )
+                return response
+            finally:
+                cache.delete(lock_key)
+
+        if stop_waiting_at is not None and monotonic() >= stop_waiting_at:
+            raise AgentCallPending(fingerprint)
+
+        if monotonic() >= wait_deadline:
+            return scheduler.call(
+                _call_agent_with_prompt, prompt, context, deadline=deadline
+            )
+
+        sleep(poll_s)
+        poll_s = min(poll_s * 2, 0.5)
+
+
+def _local_suggestion(food_logs: Sequence[AnyFoodLog]) -> str:
+    """
+    Deterministic fallback built from the 20-day summary: what is left of a
+    typical (median) day after today's intake so far, split across the meals
+    still to come today.
+    """
+    summary = _feeding_summary_last_20_days(food_logs)
+    now_pt = timezone.localtime(timezone.now(), PACIFIC_TZ)
+    today = now_pt.date().isoformat()
+    eaten_today_g = next(
+        (
+            day.food_total_g
+            for day in summary.daily_totals_last_20_days
+            if day.pt_day == today
+        ),
+        0,
+    )
+    median_g = round(summary.median_daily_food_g)
+
+    if median_g == 0:
+        return "Not enough recent history for an estimate yet."
+
+    remaining_g = median_g - eaten_today_g
+    if remaining_g <= 0:
+        return (
+            f"Biscuit has had {eaten_today_g}g today, already a typical day's "
+            f"{median_g}g - hold off until tomorrow."
+        )
+
+    meals_left = max(1, sum(1 for hour in MEAL_HOURS_PT if hour >= now_pt.hour))
+    portion_g = round(remaining_g / meals_left)
+    return (
+        f"About {portion_g}g next ({eaten_today_g}g of a typical "
+        f"{median_g}g day so far)."
+    )
+
+
+_background_pool: ThreadPoolExecutor | None = None
+_background_pool_lock = threading.Lock()
+
+
+def _get_background_pool() -> ThreadPoolExecutor:
+    global _background_pool
+    with _background_pool_lock:
+        if _background_pool is None:
+            _background_pool = ThreadPoolExecutor(
+                max_workers=settings.AGENT_MAX_IN_FLIGHT + settings.AGENT_QUEUE_SIZE,
+                thread_name_prefix="agent",
+            )
+        return _background_pool
+
+
+def _call_agent_in_background(
+    prompt: str, fingerprint: str, deadline: float, context: str
+) -> str:
+    # Once the page has given up there is no one to hand a waiter's result
+    # to; only the leader's cache.set matters, so waiters free the thread.
+    try:
+        return _call_agent_coalesced(
+            prompt, fingerprint, deadline, context, stop_waiting_at=deadline
+        )
+    finally:
+        # The db cache backend opens a connection on this thread.
+        close_old_connections()
+
+
+def peek_agent_suggestion(fingerprint: str) -> str | None:
+    """
+    The agent's answer for a fingerprint if a call has already finished.
+    """
+    return cache.get(f"agent:result:{fingerprint}")
+
+
+def get_agent_suggestion(food_logs: Sequence[AnyFoodLog]) -> AgentSuggestion:
     """
     Public helper the view will call:
     - builds the prompt using the provided food_logs
-    - calls the agent
-    - returns the agent's text suggestion
+    - calls the agent, sharing the call with any concurrent request for the
+      same data
+    - returns the agent's suggestion
+
+    The call is hedged against AGENT_LATENCY_BUDGET_S: if the agent has not
+    answered by then (or was shed as overloaded) we return the local estimate
+    instead. A slow call keeps running in the background and caches its
+    answer for peek_agent_suggestion and the next page load.
     """
-    prompt = _build_prompt(food_logs)
-    return _call_agent_with_prompt(prompt)
+    deadline = monotonic() + settings.AGENT_LATENCY_BUDGET_S
+    context = _build_prompt_context(food_logs)
+    prompt = _build_prompt(food_logs, context=context)
+    fingerprint = _prompt_fingerprint(context)
+
+    cached = peek_agent_suggestion(fingerprint)
+    if cached is not None:
+        return AgentSuggestion(text=cached, fingerprint=fingerprint)
+
+    future = _get_background_pool().submit(
+        _call_agent_in_background, prompt, fingerprint, deadline, context
+    )
+    try:
+        text = future.result(timeout=max(0.0, deadline - monotonic()))
+    except (FutureTimeoutError, AgentCallPending):
+        return AgentSuggestion(
+            text=_local_suggestion(food_logs),
+            fingerprint=fingerprint,
+            source="local",
+            pending=True,
+        )
+    except AgentOverloaded:
+        return AgentSuggestion(
+            text=_local_suggestion(food_logs),
+            fingerprint=fingerprint,
+            source="local",
+        )
+    return AgentSuggestion(text=text, fingerprint=fingerprint)
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class FoodtrackerConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "foodtracker"
+
+    def ready(self):
+        from foodtracker import signals  # noqa: F401
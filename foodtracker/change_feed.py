@@ -0,0 +1,78 @@
+import asyncio
+from collections.abc import AsyncIterator
+from time import monotonic
+
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import render_to_string
+
+from foodtracker.models import FoodLog, FoodLogRow
+
+FEED_VERSION_KEY = "foodlog:feed_version"
+
+# How long the browser waits before reconnecting after a stream ends.
+RETRY_MS = 3000
+KEEPALIVE_S = 15
+
+
+def bump_feed_version() -> None:
+    """
+    Tell open event streams (in any worker sharing the cache) that new rows
+    were saved.
+    """
+    cache.add(FEED_VERSION_KEY, 0, timeout=None)
+    try:
+        cache.incr(FEED_VERSION_KEY)
+    except ValueError:
+        cache.set(FEED_VERSION_KEY, 1, timeout=None)
+
+
+def format_sse_event(row: FoodLogRow) -> str:
+    html = render_to_string("foodtracker/partials/food_log_row.html", {"log": row})
+    data = "".join(f"data: {line.strip()}\n" for line in html.splitlines())
+    return f"id: {row.id}\nevent: foodlog\n{data}\n"
+
+
+async def _rows_after(last_id: int) -> list[FoodLogRow]:
+    rows = (
+        FoodLog.objects.filter(id__gt=last_id)
+        .order_by("id")
+        .values_list(*FoodLogRow.FIELDS)
+    )
+    return [FoodLogRow(*values) async for values in rows[:50]]
+
+
+async def food_log_event_stream(last_id: int) -> AsyncIterator[str]:
+    """
+    Server-sent events for rows saved after `last_id`, oldest first.
+
+    The DB is only queried when the cache feed version moves, plus every
+    FOODLOG_EVENTS_DB_POLL_S as a backstop for a per-process cache that
+    can't see other workers' saves. The stream ends after
+    FOODLOG_EVENTS_MAX_S and the browser reconnects with Last-Event-ID.
+    """
+    deadline = monotonic() + settings.FOODLOG_EVENTS_MAX_S
+    seen_version = None
+    last_db_check = last_sent = monotonic()
+    yield f"retry: {RETRY_MS}\n\n"
+
+    while True:
+        version = await cache.aget(FEED_VERSION_KEY, 0)
+        now = monotonic()
+        if (
+            version != seen_version
+            or now - last_db_check >= settings.FOODLOG_EVENTS_DB_POLL_S
+        ):
+            seen_version = version
+            last_db_check = now
+            for row in await _rows_after(last_id):
+                last_id = row.id
+                last_sent = now
+                yield format_sse_event(row)
+
+        if now >= deadline:
+            return
+        if now - last_sent >= KEEPALIVE_S:
+            last_sent = now
+            yield ": keepalive\n\n"
+        await asyncio.sleep(settings.FOODLOG_EVENTS_POLL_S)
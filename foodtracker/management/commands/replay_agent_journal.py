@@ -0,0 +1,134 @@
+import math
+from concurrent.futures import ThreadPoolExecutor
+from time import monotonic
+
+import httpx
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from foodtracker.agent_endpoints import get_agent_endpoints
+from foodtracker.agent_journal import read_journal, status_for_error
+from foodtracker.agent_service import (
+    AGENT_COMPLETIONS_PATH,
+    _agent_headers,
+    _agent_payload,
+)
+
+
+def _percentile(sorted_values: list[float], pct: float) -> float:
+    """
+    Nearest-rank percentile of an already sorted list.
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(
+        0, min(len(sorted_values) - 1, math.ceil(pct / 100 * len(sorted_values)) - 1)
+    )
+    return sorted_values[rank]
+
+
+class Command(BaseCommand):
+    help = (
+        "Re-send prompts recorded in the agent journal against an endpoint and "
+        "report latency percentiles next to the recorded ones."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--journal",
+            default=None,
+            help="Journal file to replay (default: AGENT_JOURNAL_PATH).",
+        )
+        parser.add_argument(
+            "--endpoint",
+            default=None,
+            help="Agent endpoint to send to (default: the first configured one).",
+        )
+        parser.add_argument("--concurrency", type=int, default=4)
+        parser.add_argument(
+            "--limit", type=int, default=None, help="Replay at most this many calls."
+        )
+        parser.add_argument(
+            "--distinct",
+            action="store_true",
+            help=(
+                "Send each distinct prompt context once instead of every "
+                "recorded call."
+            ),
+        )
+
+    def handle(self, *args, **options):
+        path = options["journal"] or settings.AGENT_JOURNAL_PATH
+        endpoint = options["endpoint"] or get_agent_endpoints()[0]
+        if not path:
+            raise CommandError("No journal given and AGENT_JOURNAL_PATH is not set.")
+        if not endpoint:
+            raise CommandError("No endpoint given and no agent endpoint configured.")
+
+        try:
+            entries = [entry for entry in read_journal(path) if entry.prompt]
+        except FileNotFoundError:
+            raise CommandError(f"Journal {path} does not exist.")
+        if options["distinct"]:
+            entries = list({entry.prompt_hash: entry for entry in entries}.values())
+        if options["limit"] is not None:
+            entries = entries[: options["limit"]]
+        if not entries:
+            raise CommandError(f"Journal {path} has no replayable calls.")
+
+        url = f"{endpoint.rstrip('/')}{AGENT_COMPLETIONS_PATH}"
+        headers = _agent_headers()
+
+        with httpx.Client(timeout=settings.AGENT_TIMEOUT_S) as client:
+
+            def send(prompt: str) -> tuple[float, str]:
+                started = monotonic()
+                try:
+                    resp = client.post(
+                        url, json=_agent_payload(prompt), headers=headers
+                    )
+                    resp.raise_for_status()
+                except Exception as e:
+                    return monotonic() - started, status_for_error(e)
+                return monotonic() - started, "ok"
+
+            started = monotonic()
+            with ThreadPoolExecutor(max_workers=options["concurrency"]) as pool:
+                results = list(pool.map(send, [entry.prompt for entry in entries]))
+            wall_s = monotonic() - started
+
+        replayed_ms = sorted(
+            latency * 1000 for latency, status in results if status == "ok"
+        )
+        recorded_ms = sorted(
+            float(entry.latency_ms) for entry in entries if entry.status == "ok"
+        )
+        failures: dict[str, int] = {}
+        for _, status in results:
+            if status != "ok":
+                failures[status] = failures.get(status, 0) + 1
+
+        prompt_bytes = sorted(entry.prompt_bytes for entry in entries)
+        self.stdout.write(
+            f"Replayed {len(results)} calls to {endpoint} "
+            f"at concurrency {options['concurrency']} in {wall_s:.2f}s"
+        )
+        self.stdout.write(
+            f"Prompt bytes: p50={_percentile(prompt_bytes, 50):.0f} "
+            f"max={prompt_bytes[-1]}"
+        )
+        for label, values in (("replayed", replayed_ms), ("recorded", recorded_ms)):
+            self.stdout.write(
+                f"{label:>9} ms: n={len(values)} "
+                + " ".join(
+                    f"p{pct}={_percentile(values, pct):.0f}" for pct in (50, 90, 95, 99)
+                )
+                + f" max={values[-1] if values else 0:.0f}"
+            )
+        if failures:
+            self.stdout.write(
+                "Failures: "
+                + ", ".join(
+                    f"{status}={count}" for status, count in sorted(failures.items())
+                )
+            )
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("foodtracker", "0002_add_teeth_brush_field"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="foodlog",
+            index=models.Index(
+                fields=["feeddatetime", "id"], name="foodlog_feeddt_id_idx"
+            ),
+        ),
+    ]
@@ -1,11 +1,24 @@
+from datetime import datetime
 from zoneinfo import ZoneInfo
 
-from django.db import models
+from django.db import models, transaction
 from django.utils import timezone
 
 PACIFIC_TZ = ZoneInfo("America/Los_Angeles")
 
 
+def _llm_dict(log: "AnyFoodLog") -> dict:
+    """
+    The prompt's view of one log entry, shared by FoodLog and FoodLogRow.
+    """
+    return {
+        "feeddatetime": log.feeddatetime_pt.isoformat(),
+        "food_qty_g": log.food_qty,
+        "water_qty_ml": log.water_qty,
+        "teeth_brush": log.teeth_brush,
+    }
+
+
 class FoodLog(models.Model):
     feeddatetime = models.DateTimeField()
     food_qty = models.IntegerField()
@@ -14,12 +27,68 @@ class FoodLog(models.Model):
 
     class Meta:
         db_table = "foodlog"
+        indexes = [
+            # Serves ORDER BY -feeddatetime, -id (list page, admin) and the
+            # admin date hierarchy without a sort over the whole table.
+            models.Index(fields=["feeddatetime", "id"], name="foodlog_feeddt_id_idx"),
+        ]
+
+    @property
+    def feeddatetime_pt(self) -> datetime:
+        return timezone.localtime(self.feeddatetime, PACIFIC_TZ)
 
     def to_llm_dict(self) -> dict:
-        dt_pt = timezone.localtime(self.feeddatetime, PACIFIC_TZ)
-        return {
-            "feeddatetime": dt_pt.isoformat(),
-            "food_qty_g": self.food_qty,
-            "water_qty_ml": self.water_qty,
-            "teeth_brush": self.teeth_brush,
-        }
+        return _llm_dict(self)
+
+    def delete(self, *args, **kwargs):
+        # Queryset deletes skip this; the admin's bulk actions invalidate
+        # once themselves.
+        from foodtracker.recent_logs import invalidate_recent_logs
+
+        result = super().delete(*args, **kwargs)
+        transaction.on_commit(invalidate_recent_logs)
+        return result
+
+
+class FoodLogRow:
+    """
+    Lean read-only stand-in for FoodLog on the list/prompt/summary paths,
+    built straight from a values_list() tuple. The PT conversion is done once
+    here instead of separately by the prompt and the summary.
+    """
+
+    FIELDS = ("id", "feeddatetime", "food_qty", "water_qty", "teeth_brush")
+
+    __slots__ = (
+        "id",
+        "feeddatetime",
+        "feeddatetime_pt",
+        "food_qty",
+        "water_qty",
+        "teeth_brush",
+    )
+
+    def __init__(
+        self,
+        id: int,
+        feeddatetime: datetime,
+        food_qty: int,
+        water_qty: int,
+        teeth_brush: bool,
+    ):
+        self.id = id
+        self.feeddatetime = feeddatetime
+        self.feeddatetime_pt = timezone.localtime(feeddatetime, PACIFIC_TZ)
+        self.food_qty = food_qty
+        self.water_qty = water_qty
+        self.teeth_brush = teeth_brush
+
+    def __repr__(self) -> str:
+        return f"<FoodLogRow {self.id} {self.feeddatetime.isoformat()}>"
+
+    def to_llm_dict(self) -> dict:
+        return _llm_dict(self)
+
+
+# Anything the prompt and summary code can read from.
+AnyFoodLog = FoodLog | FoodLogRow
@@ -0,0 +1,126 @@
+from time import time_ns
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+
+from foodtracker.models import FoodLog, FoodLogRow
+
+RECENT_LOGS_LIMIT = 50
+
+VERSION_KEY = "foodlog:recent:version"
+
+
+def _rows_key(version: int) -> str:
+    return f"foodlog:recent:rows:{version}"
+
+
+def _cache_is_process_local() -> bool:
+    return isinstance(caches["default"], LocMemCache)
+
+
+def _cache_ttl() -> int:
+    # Other workers' writes never reach a per-process cache, so only keep
+    # the window briefly there.
+    if _cache_is_process_local():
+        return settings.RECENT_LOGS_LOCAL_CACHE_TTL_S
+    return settings.RECENT_LOGS_CACHE_TTL_S
+
+
+def _seed_version() -> None:
+    # Seeded from the clock so a version key lost to eviction can't come
+    # back as a number whose rows entry is still cached.
+    cache.add(VERSION_KEY, time_ns() // 1000, timeout=None)
+
+
+def _current_version() -> int:
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        _seed_version()
+        version = cache.get(VERSION_KEY) or 0
+    return version
+
+
+def _bump_version() -> int:
+    try:
+        version = cache.incr(VERSION_KEY)
+    except ValueError:
+        _seed_version()
+        version = cache.incr(VERSION_KEY)
+    # Take the new number's rows slot, empty, so a prepend that read the old
+    # version can't publish its window under it. The file and db backends
+    # do incr as get then set, so two bumps may land on the same number;
+    # both leave the slot empty, which is all either needs.
+    cache.set(_rows_key(version), None, timeout=_cache_ttl())
+    return version
+
+
+def _query_recent_logs() -> list[FoodLogRow]:
+    # Ties on feeddatetime go newest insert first, the same order
+    # prepend_recent_log builds, so both paths agree on the window.
+    rows = FoodLog.objects.order_by("-feeddatetime", "-id").values_list(
+        *FoodLogRow.FIELDS
+    )
+    return [FoodLogRow(*values) for values in rows[:RECENT_LOGS_LIMIT]]
+
+
+def get_recent_logs() -> list[FoodLogRow]:
+    """
+    The newest RECENT_LOGS_LIMIT rows, newest first, read through the cache.
+
+    The window lives under a versioned key: writers never edit an entry in
+    place, they publish a new version, so a reader sees either the old
+    window or the new one. Over a cache shared by all workers (db backend)
+    a steady-state page load is two cache reads, the version and then the
+    window, and no FoodLog query.
+    """
+    key = _rows_key(_current_version())
+    rows = cache.get(key)
+    if rows is None:
+        rows = _query_recent_logs()
+        cache.set(key, rows, timeout=_cache_ttl())
+    return list(rows)
+
+
+def prepend_recent_log(food_log: FoodLog) -> None:
+    """
+    Publish a window with a newly inserted row on top, trimmed back to the
+    limit. If the cached window is missing or the row isn't the newest, we
+    only bump the version and let the next read re-query.
+
+    Publishing is a compare-and-set on the next version's rows slot:
+    cache.add only succeeds for the first writer (except on the file
+    backend, whose add isn't atomic). A writer that loses to another
+    insert, or to a bump, bumps instead, which empties whatever window is
+    current so the next read re-queries.
+    """
+    version = _current_version()
+    rows = cache.get(_rows_key(version))
+    if rows is None or (rows and food_log.feeddatetime < rows[0].feeddatetime):
+        _bump_version()
+        return
+
+    row = FoodLogRow(
+        food_log.id,
+        food_log.feeddatetime,
+        food_log.food_qty,
+        food_log.water_qty,
+        food_log.teeth_brush,
+    )
+    published = cache.add(
+        _rows_key(version + 1),
+        [row, *rows][:RECENT_LOGS_LIMIT],
+        timeout=_cache_ttl(),
+    )
+    if not published:
+        _bump_version()
+        return
+    cache.set(VERSION_KEY, version + 1, timeout=None)
+
+
+def invalidate_recent_logs() -> None:
+    """
+    Edits and deletes can move or drop any row in the window: start over.
+    Bulk operations call this once when they are done.
+    """
+    _bump_version()
@@ -0,0 +1,24 @@
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from foodtracker.change_feed import bump_feed_version
+from foodtracker.models import FoodLog
+from foodtracker.recent_logs import invalidate_recent_logs, prepend_recent_log
+
+# Cache updates wait for the commit so nobody is shown a row that was
+# rolled back, or pointed at one they can't read yet.
+
+
+@receiver(post_save, sender=FoodLog)
+def push_new_food_log(sender, instance, created, **kwargs):
+    if created:
+        transaction.on_commit(lambda: prepend_recent_log(instance))
+        transaction.on_commit(bump_feed_version)
+    else:
+        transaction.on_commit(invalidate_recent_logs)
+
+
+# Deletes are handled in FoodLog.delete() rather than by a post_delete
+# receiver: any delete receiver makes every queryset delete() load its rows
+# first, which the admin's batched actions avoid.
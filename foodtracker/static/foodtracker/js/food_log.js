@@ -0,0 +1,195 @@
+function formatLocalDatetimes() {
+    document.querySelectorAll('.local-datetime').forEach(function (el) {
+        const iso = el.getAttribute('data-utc-dt');
+        if (iso) {
+            const date = new Date(iso);
+            if (!isNaN(date)) {
+                // Format as YYYY-MM-DD HH:mm (local)
+                const y = date.getFullYear();
+                const m = String(date.getMonth() + 1).padStart(2, '0');
+                const d = String(date.getDate()).padStart(2, '0');
+                const hr = String(date.getHours()).padStart(2, '0');
+                const min = String(date.getMinutes()).padStart(2, '0');
+                el.textContent = `${y}-${m}-${d} ${hr}:${min}`;
+            }
+        }
+    });
+}
+
+function initializeChart() {
+    // Get the data from the table
+    const rows = document.querySelectorAll('#food-log-table-body tr');
+    const dataByDay = {};
+
+    // Group data by day
+    rows.forEach(row => {
+        const dateCell = row.querySelector('.local-datetime');
+        if (!dateCell) return;
+
+        const dateStr = dateCell.textContent.trim().split(' ')[0]; // Get just the date part
+        const foodQty = parseFloat(row.cells[1].textContent.trim()) || 0;
+
+        if (!dataByDay[dateStr]) {
+            dataByDay[dateStr] = 0;
+        }
+        dataByDay[dateStr] += foodQty;
+    });
+
+    // Sort dates chronologically
+    const sortedDates = Object.keys(dataByDay).sort((a, b) => new Date(a) - new Date(b));
+    const chartData = sortedDates.map(date => dataByDay[date]);
+
+    // Create the chart
+    const ctx = document.getElementById('foodHistogram').getContext('2d');
+    if (window.foodChart) {
+        window.foodChart.destroy();
+    }
+
+    window.foodChart = new Chart(ctx, {
+        type: 'bar',
+        data: {
+            labels: sortedDates,
+            datasets: [{
+                label: '',
+                data: chartData,
+                backgroundColor: 'rgba(13, 110, 253, 0.5)',
+                borderColor: 'rgba(13, 110, 253, 1)',
+                borderWidth: 1
+            }]
+        },
+        options: {
+            responsive: true,
+            maintainAspectRatio: false,
+            scales: {
+                y: {
+                    beginAtZero: true,
+                    title: {
+                        display: false
+                    },
+                    ticks: {
+                        color: '#dee2e6'
+                    },
+                    grid: {
+                        color: 'rgba(255, 255, 255, 0.1)'
+                    }
+                },
+                x: {
+                    title: {
+                        display: false
+                    },
+                    ticks: {
+                        color: '#dee2e6',
+                        maxRotation: 45,
+                        minRotation: 45
+                    },
+                    grid: {
+                        color: 'rgba(255, 255, 255, 0.1)'
+                    }
+                }
+            },
+            plugins: {
+                legend: {
+                    display: false
+                },
+                tooltip: {
+                    mode: 'index',
+                    intersect: false,
+                    backgroundColor: 'rgba(0, 0, 0, 0.8)',
+                    titleColor: '#fff',
+                    bodyColor: '#fff',
+                    borderColor: 'rgba(255, 255, 255, 0.1)',
+                    borderWidth: 1
+                }
+            }
+        }
+    });
+}
+
+function pollAgentSuggestion() {
+    // A local estimate is shown while the agent is slow; swap in the
+    // agent's answer once the background call has finished.
+    const el = document.getElementById('agent-suggestion');
+    if (!el || !el.dataset.pollUrl) return;
+    const url = el.dataset.pollUrl;
+    delete el.dataset.pollUrl;
+
+    let attempts = 0;
+    const timer = setInterval(async function () {
+        attempts++;
+        try {
+            const resp = await fetch(url);
+            if (resp.status === 200) {
+                clearInterval(timer);
+                document.getElementById('agent-suggestion').outerHTML = await resp.text();
+                return;
+            }
+        } catch (e) {
+            // Network hiccup, try again on the next tick
+        }
+        if (attempts >= 15) {
+            clearInterval(timer);
+        }
+    }, 1000);
+}
+
+function subscribeToNewLogs() {
+    // Rows logged on other devices are pushed over server-sent events,
+    // so the page never needs a reload to pick them up.
+    const body = document.getElementById('food-log-table-body');
+    if (!window.EventSource || !body.dataset.eventsUrl) return;
+
+    const source = new EventSource(body.dataset.eventsUrl);
+    source.addEventListener('foodlog', function (event) {
+        if (body.querySelector(`tr[data-log-id="${event.lastEventId}"]`)) return;
+        const empty = body.querySelector('tr.empty-row');
+        if (empty) empty.remove();
+        body.insertAdjacentHTML('afterbegin', event.data);
+        formatLocalDatetimes();
+        initializeChart();
+    });
+}
+
+function handleFormSubmit(form) {
+    const button = form.querySelector('#submit-btn');
+    const buttonText = form.querySelector('#button-text');
+    const spinner = form.querySelector('#spinner');
+
+    if (button.disabled) {
+        return false;
+    }
+
+    button.disabled = true;
+    buttonText.textContent = 'Adding...';
+    spinner.classList.remove('d-none');
+
+    // Re-enable the button if the form submission fails
+    setTimeout(() => {
+        if (button.disabled) {
+            button.disabled = false;
+            buttonText.textContent = 'Add';
+            spinner.classList.add('d-none');
+        }
+    }, 5000); // Re-enable after 5 seconds if still disabled
+
+    return true;
+}
+
+function registerServiceWorker() {
+    // The service worker keeps the static shell cached, so repeat visits
+    // only fetch the page itself.
+    const url = document.body.dataset.serviceWorkerUrl;
+    if (!('serviceWorker' in navigator) || !url) return;
+    navigator.serviceWorker.register(url).catch(function () {
+        // Not fatal: the page works the same, just without offline caching
+    });
+}
+
+function initializePage() {
+    formatLocalDatetimes();
+    initializeChart();
+    pollAgentSuggestion();
+    subscribeToNewLogs();
+    registerServiceWorker();
+}
+
+document.addEventListener('DOMContentLoaded', initializePage);
@@ -0,0 +1,84 @@
+import mimetypes
+import re
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404
+from django.utils._os import safe_join
+from django.views.decorators.http import require_safe
+
+# ManifestStaticFilesStorage names look like app.3f2a9c1b7d4e.css
+HASHED_NAME_RE = re.compile(r"\.[0-9a-f]{12}\.[^./]+$")
+
+FAR_FUTURE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# Best first.
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+
+def _accepted_encodings(request) -> set[str]:
+    header = request.headers.get("Accept-Encoding", "")
+    return {part.split(";")[0].strip() for part in header.split(",") if part.strip()}
+
+
+@require_safe
+def serve_static(request, path):
+    """
+    Serve collected static files from STATIC_ROOT without a separate web
+    server: the precompressed .br/.gz sibling when the client accepts it,
+    and a far-future immutable Cache-Control on content-hashed names (the
+    hash changes whenever the file does). Files that haven't been collected
+    are served from the app's static directory, uncompressed.
+    """
+    if path.endswith((".gz", ".br")):
+        raise Http404("Compressed variants are negotiated, not requested.")
+
+    try:
+        full_path = Path(safe_join(settings.STATIC_ROOT, path))
+    except SuspiciousFileOperation:
+        raise Http404("Not a static file.")
+    if not full_path.is_file():
+        found = finders.find(path)
+        if not found:
+            raise Http404("Not a static file.")
+        full_path = Path(found)
+
+    content_type, _ = mimetypes.guess_type(full_path.name)
+    accepted = _accepted_encodings(request)
+    encoding = None
+    for name, suffix in ENCODINGS:
+        candidate = full_path.with_name(full_path.name + suffix)
+        if name in accepted and candidate.is_file():
+            full_path, encoding = candidate, name
+            break
+
+    response = FileResponse(
+        full_path.open("rb"),
+        content_type=content_type or "application/octet-stream",
+    )
+    if encoding:
+        response["Content-Encoding"] = encoding
+    response["Vary"] = "Accept-Encoding"
+    if HASHED_NAME_RE.search(path):
+        response["Cache-Control"] = FAR_FUTURE_CACHE_CONTROL
+    else:
+        response["Cache-Control"] = "no-cache"
+    return response
+
+
+def shell_asset_urls() -> list[str]:
+    """
+    URLs of the static files the page shell needs, as the page links them.
+    """
+    return [
+        staticfiles_storage.url(name)
+        for name in (
+            "foodtracker/vendor/bootstrap-5.3.8/bootstrap.min.css",
+            "foodtracker/css/food_log.css",
+            "foodtracker/vendor/chart.js-4.4.0/chart.umd.min.js",
+            "foodtracker/js/food_log.js",
+        )
+    ]
@@ -0,0 +1,75 @@
+import gzip
+from io import BytesIO
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+try:
+    import brotli
+except ImportError:  # declared, but without it we still ship .gz
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = (".css", ".js", ".svg", ".txt", ".json", ".html", ".map")
+
+# Not worth a second request round-trip below this size.
+MIN_COMPRESS_BYTES = 256
+
+
+def _gzip(data: bytes) -> bytes:
+    buffer = BytesIO()
+    with gzip.GzipFile(fileobj=buffer, mode="wb", compresslevel=9, mtime=0) as gz:
+        gz.write(data)
+    return buffer.getvalue()
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    Manifest (content-hashed) static files, plus .gz and, when the brotli
+    package is installed, .br siblings written at collectstatic time so
+    foodtracker.static_serving never compresses per request. Until
+    collectstatic has run, {% static %} falls back to the unhashed name.
+    """
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+
+        if dry_run:
+            return
+
+        for name in sorted(set(self.hashed_files.values())):
+            for compressed_name in self._write_compressed(name):
+                yield name, compressed_name, True
+
+    def _write_compressed(self, name: str) -> list[str]:
+        if not name.endswith(COMPRESSIBLE_EXTENSIONS):
+            return []
+
+        with self.open(name) as original:
+            data = original.read()
+        if len(data) < MIN_COMPRESS_BYTES:
+            return []
+
+        encoders = [(".gz", _gzip)]
+        if brotli is not None:
+            encoders.append((".br", lambda raw: brotli.compress(raw, quality=11)))
+
+        written = []
+        for suffix, encode in encoders:
+            compressed = encode(data)
+            if len(compressed) >= len(data):
+                continue
+            compressed_name = name + suffix
+            if self.exists(compressed_name):
+                self.delete(compressed_name)
+            self._save(compressed_name, ContentFile(compressed))
+            written.append(compressed_name)
+        return written
+
+    def stored_name(self, name: str) -> str:
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            # Not collected yet (no manifest, e.g. runserver with DEBUG=False,
+            # or a file added since): link the plain name, which
+            # static_serving finds in the app's static directory.
+            return name
@@ -0,0 +1,70 @@
+// Caches the page shell (CSS/JS) so repeat visits only fetch the page itself.
+// Asset URLs are content-hashed, so a deploy changes CACHE_NAME and the old
+// cache is dropped on activate. Unhashed URLs are only a fallback copy.
+const CACHE_NAME = 'foodtracker-shell-{{ cache_version }}';
+const PAGE_CACHE_NAME = 'foodtracker-pages';
+const SHELL_ASSETS = {{ shell_assets_json|safe }};
+const HASHED_NAME_RE = new RegExp({{ hashed_name_re_json|safe }});
+
+self.addEventListener('install', function (event) {
+    event.waitUntil(
+        caches.open(CACHE_NAME)
+            .then(function (cache) { return cache.addAll(SHELL_ASSETS); })
+            .then(function () { return self.skipWaiting(); })
+    );
+});
+
+self.addEventListener('activate', function (event) {
+    event.waitUntil(
+        caches.keys().then(function (names) {
+            return Promise.all(names
+                .filter(function (name) { return name !== CACHE_NAME && name !== PAGE_CACHE_NAME; })
+                .map(function (name) { return caches.delete(name); }));
+        }).then(function () { return self.clients.claim(); })
+    );
+});
+
+function cacheFirst(request) {
+    return caches.match(request).then(function (cached) {
+        return cached || fetch(request).then(function (response) {
+            if (response.ok) {
+                const copy = response.clone();
+                caches.open(CACHE_NAME).then(function (cache) { cache.put(request, copy); });
+            }
+            return response;
+        });
+    });
+}
+
+function networkFirst(request, cacheName) {
+    return fetch(request).then(function (response) {
+        if (response.ok) {
+            const copy = response.clone();
+            caches.open(cacheName).then(function (cache) { cache.put(request, copy); });
+        }
+        return response;
+    }).catch(function () {
+        return caches.match(request);
+    });
+}
+
+self.addEventListener('fetch', function (event) {
+    const request = event.request;
+    if (request.method !== 'GET') return;
+
+    const url = new URL(request.url);
+    if (url.origin !== self.location.origin) return;
+
+    if (url.pathname.startsWith('{{ static_url }}')) {
+        // Hashed assets never change under the same URL; unhashed ones
+        // (before collectstatic has run) can, so they go to the network.
+        if (HASHED_NAME_RE.test(url.pathname)) {
+            event.respondWith(cacheFirst(request));
+        } else {
+            event.respondWith(networkFirst(request, CACHE_NAME));
+        }
+    } else if (request.mode === 'navigate') {
+        // Pages: always fresh data, last good copy when offline
+        event.respondWith(networkFirst(request, PAGE_CACHE_NAME));
+    }
+});
@@ -0,0 +1,59 @@
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+import pytest
+from django.core.cache import cache
+
+from foodtracker.models import FoodLog
+
+
+def make_foodlog(
+    *,
+    day: int,
+    hour: int,
+    food_qty: int,
+    minute: int = 0,
+    year: int = 2025,
+    month: int = 10,
+    water_qty: int = 0,
+    teeth_brush: bool = False,
+) -> FoodLog:
+    """
+    Create a FoodLog row for testing, fed at the given UTC time.
+    """
+    return FoodLog.objects.create(
+        feeddatetime=datetime(
+            year, month, day, hour, minute, 0, tzinfo=ZoneInfo("UTC")
+        ),
+        food_qty=food_qty,
+        water_qty=water_qty,
+        teeth_brush=teeth_brush,
+    )
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache():
+    """
+    Coalesced agent results live in the cache; don't let them leak between tests.
+    """
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def _agent_journal(settings, tmp_path):
+    """
+    Keep the agent journal out of the working tree.
+    """
+    settings.AGENT_JOURNAL_PATH = str(tmp_path / "agent_journal.jsonl")
+    return settings.AGENT_JOURNAL_PATH
+
+
+@pytest.fixture(autouse=True)
+def _uncollected_static_files(settings, tmp_path):
+    """
+    Start from an empty STATIC_ROOT, as on a checkout where collectstatic
+    hasn't run, rather than whatever is in the working tree.
+    """
+    settings.STATIC_ROOT = tmp_path / "staticfiles"
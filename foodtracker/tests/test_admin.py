@@ -0,0 +1,148 @@
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+
+from foodtracker import admin as foodlog_admin
+from foodtracker.admin import EstimatedCountPaginator
+from foodtracker.models import FoodLog
+from foodtracker.recent_logs import get_recent_logs, invalidate_recent_logs
+from foodtracker.tests.conftest import make_foodlog
+
+
+class FoodLogAdminTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_superuser("admin", "admin@example.com", None)
+        self.client.force_login(self.user)
+        self.changelist_url = reverse("admin:foodtracker_foodlog_changelist")
+
+
+class TestFoodLogChangelist(FoodLogAdminTestCase):
+    def test_changelist_lists_newest_first_without_delete_selected(self):
+        make_foodlog(day=24, hour=15, food_qty=11)
+        make_foodlog(day=25, hour=15, food_qty=22)
+
+        response = self.client.get(self.changelist_url)
+
+        self.assertEqual(response.status_code, 200)
+        results = list(response.context["cl"].result_list)
+        self.assertEqual([log.food_qty for log in results], [22, 11])
+
+        actions = [
+            name for name, _ in response.context["action_form"].fields["action"].choices
+        ]
+        self.assertIn("rollup_by_day", actions)
+        self.assertIn("delete_in_batches", actions)
+        self.assertNotIn("delete_selected", actions)
+
+    def test_paginator_counts_through_a_limit(self):
+        for hour in range(5):
+            make_foodlog(day=25, hour=hour, food_qty=1)
+
+        self.assertEqual(
+            EstimatedCountPaginator(FoodLog.objects.order_by("id"), 2).count, 5
+        )
+
+        with patch.object(foodlog_admin, "COUNT_CAP", 3):
+            paginator = EstimatedCountPaginator(FoodLog.objects.order_by("id"), 2)
+            with self.assertNumQueries(1) as ctx:
+                self.assertEqual(paginator.count, 3)
+        self.assertIn("LIMIT 3", ctx.captured_queries[0]["sql"])
+
+
+class TestFoodLogAdminActions(FoodLogAdminTestCase):
+    def _run_action(self, action, logs):
+        return self.client.post(
+            self.changelist_url,
+            {"action": action, "_selected_action": [log.id for log in logs]},
+            follow=True,
+        )
+
+    def test_rollup_by_day_merges_into_earliest_row_per_pt_day(self):
+        # 2025-10-24 PT: 16:00 UTC and 23:00 UTC; 2025-10-25 06:00 UTC is
+        # still 2025-10-24 23:00 PT.
+        first = make_foodlog(day=24, hour=16, food_qty=10, water_qty=20)
+        second = make_foodlog(
+            day=24, hour=23, food_qty=20, water_qty=40, teeth_brush=True
+        )
+        late = make_foodlog(day=25, hour=6, food_qty=5, water_qty=10)
+        next_day = make_foodlog(day=25, hour=16, food_qty=30)
+        unselected = make_foodlog(day=24, hour=18, food_qty=99)
+
+        response = self._run_action("rollup_by_day", [first, second, late, next_day])
+
+        self.assertContains(response, "Rolled up 2 logs into 2 daily entries.")
+        self.assertEqual(
+            set(FoodLog.objects.values_list("id", flat=True)),
+            {first.id, next_day.id, unselected.id},
+        )
+        first.refresh_from_db()
+        self.assertEqual(first.food_qty, 35)
+        self.assertEqual(first.water_qty, 70)
+        self.assertTrue(first.teeth_brush)
+        next_day.refresh_from_db()
+        self.assertEqual(next_day.food_qty, 30)
+
+    def test_rollup_by_day_refreshes_recent_logs(self):
+        first = make_foodlog(day=24, hour=16, food_qty=10)
+        second = make_foodlog(day=24, hour=17, food_qty=20)
+        self.assertEqual([row.food_qty for row in get_recent_logs()], [20, 10])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self._run_action("rollup_by_day", [first, second])
+
+        self.assertEqual([row.food_qty for row in get_recent_logs()], [30])
+
+    def test_rollup_by_day_across_keyset_batches(self):
+        with patch.object(foodlog_admin, "BATCH_SIZE", 2):
+            logs = [
+                make_foodlog(day=24, hour=hour, food_qty=1) for hour in range(8, 13)
+            ]
+            logs.append(make_foodlog(day=26, hour=16, food_qty=4))
+
+            response = self._run_action("rollup_by_day", logs)
+
+        self.assertContains(response, "Rolled up 4 logs into 2 daily entries.")
+        self.assertEqual(
+            list(
+                FoodLog.objects.order_by("feeddatetime").values_list(
+                    "food_qty", flat=True
+                )
+            ),
+            [5, 4],
+        )
+
+    def test_delete_in_batches(self):
+        with patch.object(foodlog_admin, "BATCH_SIZE", 2):
+            logs = [make_foodlog(day=24, hour=hour, food_qty=1) for hour in range(5)]
+            keep = make_foodlog(day=25, hour=1, food_qty=1)
+
+            response = self._run_action("delete_in_batches", logs)
+
+        self.assertContains(response, "Deleted 5 logs.")
+        self.assertEqual(list(FoodLog.objects.values_list("id", flat=True)), [keep.id])
+
+    def test_delete_in_batches_refreshes_recent_logs_once(self):
+        logs = [make_foodlog(day=24, hour=hour, food_qty=hour) for hour in range(3)]
+        self.assertEqual([row.food_qty for row in get_recent_logs()], [2, 1, 0])
+
+        with patch.object(
+            foodlog_admin, "invalidate_recent_logs", wraps=invalidate_recent_logs
+        ) as invalidate:
+            with self.captureOnCommitCallbacks(execute=True) as callbacks:
+                self._run_action("delete_in_batches", logs[1:])
+
+        invalidate.assert_called_once()
+        self.assertEqual(callbacks, [])
+        self.assertEqual([row.food_qty for row in get_recent_logs()], [0])
+
+    def test_queryset_delete_does_not_load_rows(self):
+        """
+        No delete receivers on FoodLog, so a batch delete is a single DELETE
+        rather than a SELECT of every row followed by the DELETE.
+        """
+        logs = [make_foodlog(day=24, hour=hour, food_qty=1) for hour in range(3)]
+
+        with self.assertNumQueries(1):
+            FoodLog.objects.filter(id__in=[log.id for log in logs]).delete()
@@ -0,0 +1,135 @@
+import asyncio
+
+import httpx
+import pytest
+import respx
+
+from foodtracker.agent_endpoints import (
+    MIN_SAMPLES_FOR_P95,
+    EndpointLatencyTracker,
+    get_agent_endpoints,
+    tracker,
+    transport,
+)
+
+PATH = "/api/v1/chat/completions"
+
+
+@pytest.fixture(autouse=True)
+def _fresh_tracker():
+    tracker._samples.clear()
+    yield
+    tracker._samples.clear()
+
+
+def test_tracker_orders_endpoints_by_p95(settings):
+    """
+    Endpoints with enough samples sort by p95; unmeasured ones go first so
+    they get sampled.
+    """
+    latency = EndpointLatencyTracker()
+    for _ in range(20):
+        latency.record("https://slow.test", 2.0)
+        latency.record("https://fast.test", 0.2)
+
+    assert latency.ordered(["https://slow.test", "https://fast.test"]) == [
+        "https://fast.test",
+        "https://slow.test",
+    ]
+    assert latency.ordered(["https://slow.test", "https://new.test"]) == [
+        "https://new.test",
+        "https://slow.test",
+    ]
+    assert latency.hedge_delay("https://fast.test") == pytest.approx(0.2)
+
+    settings.AGENT_HEDGE_DELAY_S = 0.7
+    assert latency.hedge_delay("https://new.test") == 0.7
+
+
+def test_get_agent_endpoints_falls_back_to_single_endpoint(settings):
+    settings.AGENT_ENDPOINTS = []
+    settings.AGENT_ENDPOINT = "https://agent.example.test"
+    assert get_agent_endpoints() == ["https://agent.example.test"]
+
+    settings.AGENT_ENDPOINTS = ["https://a.test", "https://b.test"]
+    assert get_agent_endpoints() == ["https://a.test", "https://b.test"]
+
+
+@respx.mock
+def test_post_hedges_to_backup_when_primary_is_slow(settings):
+    """
+    The primary hasn't answered within the hedge delay, so the backup gets a
+    request; its answer wins and the primary request is cancelled.
+    """
+    settings.AGENT_HEDGE_DELAY_S = 0.05
+    primary_cancelled = []
+
+    async def slow_primary(request):
+        try:
+            await asyncio.sleep(2)
+        except asyncio.CancelledError:
+            primary_cancelled.append(True)
+            raise
+        return httpx.Response(200, json={"from": "primary"})
+
+    respx.post(f"https://primary.test{PATH}").mock(side_effect=slow_primary)
+    backup = respx.post(f"https://backup.test{PATH}").mock(
+        return_value=httpx.Response(200, json={"from": "backup"})
+    )
+
+    resp = transport.post(["https://primary.test", "https://backup.test"], PATH, {}, {})
+
+    assert resp.json() == {"from": "backup"}
+    assert backup.called
+    assert primary_cancelled == [True]
+    # The cancelled attempt still counts, as at least the hedge delay
+    assert tracker._samples["https://primary.test"][-1] >= 0.05
+
+
+@respx.mock
+def test_slow_primary_loses_primary_slot(settings):
+    """
+    A primary that always loses to its hedge records censored samples, so its
+    p95 rises past the backup's and the backup is tried first.
+    """
+    settings.AGENT_HEDGE_DELAY_S = 0.02
+
+    async def slow(request):
+        await asyncio.sleep(2)
+        return httpx.Response(200, json={"from": "primary"})
+
+    respx.post(f"https://primary.test{PATH}").mock(side_effect=slow)
+    respx.post(f"https://backup.test{PATH}").mock(
+        return_value=httpx.Response(200, json={"from": "backup"})
+    )
+    endpoints = ["https://primary.test", "https://backup.test"]
+
+    for _ in range(MIN_SAMPLES_FOR_P95):
+        transport.post(endpoints, PATH, {}, {})
+
+    assert tracker.ordered(endpoints)[0] == "https://backup.test"
+
+
+@respx.mock
+def test_post_fails_over_immediately_when_primary_errors(settings):
+    settings.AGENT_HEDGE_DELAY_S = 5
+    respx.post(f"https://primary.test{PATH}").mock(return_value=httpx.Response(503))
+    respx.post(f"https://backup.test{PATH}").mock(
+        return_value=httpx.Response(200, json={"from": "backup"})
+    )
+
+    resp = transport.post(["https://primary.test", "https://backup.test"], PATH, {}, {})
+
+    assert resp.json() == {"from": "backup"}
+    assert tracker._samples["https://primary.test"][-1] == settings.AGENT_TIMEOUT_S
+
+
+@respx.mock
+def test_post_raises_first_error_when_every_endpoint_fails():
+    respx.post(f"https://primary.test{PATH}").mock(return_value=httpx.Response(500))
+    respx.post(f"https://backup.test{PATH}").mock(return_value=httpx.Response(502))
+
+    with pytest.raises(httpx.HTTPStatusError) as excinfo:
+        transport.post(["https://primary.test", "https://backup.test"], PATH, {}, {})
+
+    assert excinfo.value.response.status_code == 500
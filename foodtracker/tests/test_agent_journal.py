@@ -0,0 +1,196 @@
+import json
+import time
+from io import StringIO
+
+import httpx
+import pytest
+import respx
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from foodtracker import agent_journal
+from foodtracker.agent_journal import prompt_hash, read_journal, record_agent_call
+from foodtracker.agent_service import (
+    _build_prompt,
+    _build_prompt_context,
+    _call_agent_with_prompt,
+    _prompt_fingerprint,
+)
+from foodtracker.management.commands.replay_agent_journal import _percentile
+
+AGENT_URL = "https://agent.example.test/api/v1/chat/completions"
+
+
+@pytest.fixture(autouse=True)
+def _forget_seen_prompts():
+    agent_journal._seen_prompt_hashes.clear()
+    yield
+    agent_journal._seen_prompt_hashes.clear()
+
+
+@pytest.fixture
+def agent_settings(settings):
+    settings.AGENT_ENDPOINTS = []
+    settings.AGENT_ENDPOINT = "https://agent.example.test"
+    settings.AGENT_ACCESS_KEY = "sekret-token"
+    return settings
+
+
+def _journal_lines(path):
+    with open(path, encoding="utf-8") as journal:
+        return [json.loads(line) for line in journal]
+
+
+def test_record_agent_call_writes_prompt_text_once(_agent_journal):
+    record_agent_call("feed me", 0.1234, "ok", response_chars=3, endpoint="a.test")
+    record_agent_call("feed me", 0.5, "http_503")
+
+    first, second = _journal_lines(_agent_journal)
+
+    assert first["prompt_hash"] == prompt_hash("feed me")
+    assert first["prompt_bytes"] == 7
+    assert first["latency_ms"] == 123
+    assert first["status"] == "ok"
+    assert first["response_chars"] == 3
+    assert first["endpoint"] == "a.test"
+    assert first["context"] == "feed me"
+
+    assert second["status"] == "http_503"
+    assert "context" not in second
+
+    # Replay resolves the prompt for the second entry from the first
+    assert [entry.prompt for entry in read_journal(_agent_journal)] == [
+        "feed me",
+        "feed me",
+    ]
+
+
+def test_record_agent_call_disabled(settings, tmp_path):
+    settings.AGENT_JOURNAL_PATH = ""
+    record_agent_call("feed me", 0.1, "ok")
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_read_journal_skips_torn_lines(_agent_journal):
+    record_agent_call("feed me", 0.1, "ok")
+    with open(_agent_journal, "a", encoding="utf-8") as journal:
+        journal.write('{"prompt_hash": "abc", "prom')
+
+    assert len(list(read_journal(_agent_journal))) == 1
+
+
+@respx.mock
+def test_agent_calls_are_journaled(agent_settings, _agent_journal):
+    route = respx.post(AGENT_URL)
+    route.mock(
+        return_value=httpx.Response(
+            200, json={"choices": [{"message": {"content": "15g"}}]}
+        )
+    )
+    _call_agent_with_prompt("prompt one")
+
+    route.mock(return_value=httpx.Response(500))
+    with pytest.raises(httpx.HTTPStatusError):
+        _call_agent_with_prompt("prompt two")
+
+    ok, failed = _journal_lines(_agent_journal)
+    assert ok["status"] == "ok"
+    assert ok["response_chars"] == 3
+    assert ok["endpoint"] == "agent.example.test"
+    assert failed["status"] == "http_500"
+    assert failed["context"] == "prompt two"
+
+
+@pytest.mark.django_db
+def test_prompts_over_the_same_logs_share_one_journal_entry(_agent_journal):
+    """
+    Real prompts end in an "it is currently ..." timestamp. Keying on the
+    context keeps that out of the hash, so the data is written once and only
+    the question is repeated.
+    """
+    context = _build_prompt_context([])
+    first_prompt = _build_prompt([], context=context)
+    time.sleep(0.001)
+    second_prompt = _build_prompt([], context=context)
+    assert first_prompt != second_prompt
+
+    record_agent_call(first_prompt, 0.2, "ok", context=context)
+    record_agent_call(second_prompt, 0.3, "ok", context=context)
+
+    first, second = _journal_lines(_agent_journal)
+    assert first["prompt_hash"] == second["prompt_hash"]
+    assert first["prompt_hash"] == _prompt_fingerprint(context)[:16]
+    assert first["context"] == context
+    assert "context" not in second
+    assert second["question"] == second_prompt[len(context) :]
+    assert [entry.prompt for entry in read_journal(_agent_journal)] == [
+        first_prompt,
+        second_prompt,
+    ]
+
+
+@pytest.mark.parametrize(
+    "values, pct, expected",
+    [
+        ([1, 2, 3, 4, 5], 50, 3),
+        (list(range(1, 11)), 25, 3),
+        (list(range(1, 11)), 50, 5),
+        (list(range(1, 11)), 99, 10),
+        ([7], 50, 7),
+        ([], 50, 0.0),
+    ],
+)
+def test_percentile_is_nearest_rank(values, pct, expected):
+    assert _percentile(values, pct) == expected
+
+
+@respx.mock
+def test_replay_agent_journal_reports_percentiles(agent_settings, _agent_journal):
+    record_agent_call("prompt one", 0.2, "ok")
+    record_agent_call("prompt two", 0.4, "ok")
+    record_agent_call("prompt one", 0.3, "ok")
+
+    replay = respx.post("https://other.example.test/api/v1/chat/completions").mock(
+        return_value=httpx.Response(
+            200, json={"choices": [{"message": {"content": "15g"}}]}
+        )
+    )
+
+    out = StringIO()
+    call_command(
+        "replay_agent_journal",
+        endpoint="https://other.example.test",
+        concurrency=2,
+        stdout=out,
+    )
+    output = out.getvalue()
+
+    assert replay.call_count == 3
+    sent = [json.loads(call.request.content) for call in replay.calls]
+    assert sorted(body["messages"][0]["content"] for body in sent) == [
+        "prompt one",
+        "prompt one",
+        "prompt two",
+    ]
+    assert "Replayed 3 calls to https://other.example.test" in output
+    assert "replayed ms: n=3" in output
+    assert "recorded ms: n=3 p50=300 p90=400 p95=400 p99=400 max=400" in output
+
+
+@respx.mock
+def test_replay_agent_journal_distinct_and_failures(agent_settings, _agent_journal):
+    record_agent_call("prompt one", 0.2, "ok")
+    record_agent_call("prompt one", 0.3, "ok")
+
+    respx.post(AGENT_URL).mock(return_value=httpx.Response(503))
+
+    out = StringIO()
+    call_command("replay_agent_journal", distinct=True, stdout=out)
+
+    assert "Replayed 1 calls" in out.getvalue()
+    assert "Failures: http_503=1" in out.getvalue()
+
+
+def test_replay_agent_journal_missing_file(agent_settings, tmp_path):
+    with pytest.raises(CommandError, match="does not exist"):
+        call_command("replay_agent_journal", journal=str(tmp_path / "nope.jsonl"))
@@ -0,0 +1,102 @@
+from time import monotonic
+
+import pytest
+from django.core.cache import cache
+
+from foodtracker.agent_scheduler import (
+    AgentOverloaded,
+    AgentScheduler,
+    TokenBucket,
+    _slot_key,
+)
+
+
+def test_token_bucket_sheds_when_next_token_is_past_deadline():
+    """
+    Once the burst is used up, a caller whose deadline is sooner than the next
+    token should be turned away without consuming anything.
+    """
+    bucket = TokenBucket(rate_per_s=1, burst=2)
+    deadline = monotonic() + 0.1
+
+    assert bucket.reserve(deadline)
+    assert bucket.reserve(deadline)
+    assert not bucket.reserve(deadline)
+
+
+def test_token_bucket_waits_for_token_within_deadline():
+    bucket = TokenBucket(rate_per_s=20, burst=1)
+    assert bucket.reserve(monotonic() + 1)
+
+    started = monotonic()
+    assert bucket.reserve(monotonic() + 1)
+    assert monotonic() - started >= 0.04
+
+
+def test_scheduler_runs_call_and_releases_slot():
+    scheduler = AgentScheduler(rate_per_s=10, burst=10, max_in_flight=1, queue_size=1)
+
+    assert scheduler.call(lambda x: x * 2, 21, deadline=monotonic() + 1) == 42
+    assert cache.get(_slot_key(0)) is None
+
+
+def test_scheduler_releases_slot_when_call_fails():
+    scheduler = AgentScheduler(rate_per_s=10, burst=10, max_in_flight=1, queue_size=1)
+
+    def boom():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        scheduler.call(boom, deadline=monotonic() + 1)
+    assert cache.get(_slot_key(0)) is None
+
+
+def test_scheduler_sheds_when_in_flight_limit_is_held_past_deadline():
+    """
+    Slots are lock keys in the shared cache, so calls held by other workers
+    count against the limit too.
+    """
+    scheduler = AgentScheduler(rate_per_s=10, burst=10, max_in_flight=2, queue_size=4)
+    cache.set(_slot_key(0), "other-worker")
+    cache.set(_slot_key(1), "other-worker")
+
+    started = monotonic()
+    with pytest.raises(AgentOverloaded):
+        scheduler.call(lambda: "never", deadline=monotonic() + 0.2)
+
+    assert monotonic() - started < 0.5
+    assert cache.get(_slot_key(0)) == cache.get(_slot_key(1)) == "other-worker"
+
+
+def test_scheduler_sheds_immediately_when_queue_is_full():
+    scheduler = AgentScheduler(rate_per_s=10, burst=10, max_in_flight=1, queue_size=1)
+    cache.set(_slot_key(0), "other-worker")
+    scheduler._queue_slots.acquire()
+
+    started = monotonic()
+    with pytest.raises(AgentOverloaded, match="queue is full"):
+        scheduler.call(lambda: "never", deadline=monotonic() + 5)
+
+    assert monotonic() - started < 0.1
+
+
+def test_scheduler_takes_slot_freed_while_waiting():
+    scheduler = AgentScheduler(rate_per_s=10, burst=10, max_in_flight=1, queue_size=1)
+    cache.set(_slot_key(0), "other-worker", timeout=0.1)
+
+    assert scheduler.call(lambda: "ok", deadline=monotonic() + 1) == "ok"
+
+
+def test_release_leaves_a_slot_retaken_after_expiry():
+    """
+    If our slot expired mid-call and another caller took it, finishing our
+    call must not free theirs.
+    """
+    scheduler = AgentScheduler(rate_per_s=10, burst=10, max_in_flight=1, queue_size=1)
+
+    def slow_call():
+        cache.set(_slot_key(0), "next-holder")
+        return "done"
+
+    assert scheduler.call(slow_call, deadline=monotonic() + 1) == "done"
+    assert cache.get(_slot_key(0)) == "next-holder"
@@ -1,4 +1,6 @@
 import json
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from zoneinfo import ZoneInfo
 
@@ -6,35 +8,21 @@ import httpx
 import pytest
 import respx
 
+from foodtracker.agent_scheduler import AgentOverloaded
 from foodtracker.models import FoodLog
 from foodtracker.agent_service import (
+    AgentCallPending,
     DailyFoodTotal,
     FeedingSummary,
     _feeding_summary_last_20_days,
     _build_prompt,
+    _call_agent_coalesced,
+    _get_background_pool,
+    _local_suggestion,
     get_agent_suggestion,
+    peek_agent_suggestion,
 )
-
-
-def _make_foodlog_at_utc(
-    *,
-    day: int,
-    hour: int,
-    food_qty: int,
-    minute: int = 0,
-    year: int = 2025,
-    month: int = 10,
-) -> FoodLog:
-    """
-    Create a FoodLog row for testing.
-    """
-    dt_utc = datetime(year, month, day, hour, minute, 0, tzinfo=ZoneInfo("UTC"))
-    return FoodLog.objects.create(
-        feeddatetime=dt_utc,
-        food_qty=food_qty,
-        water_qty=0,
-        teeth_brush=False,
-    )
+from foodtracker.tests.conftest import make_foodlog
 
 
 @pytest.mark.django_db
@@ -42,8 +30,8 @@ def test_build_prompt_exact(monkeypatch):
     """
     _build_prompt should embed recent logs and the aggregated 20-day PT summary.
     """
-    log1 = _make_foodlog_at_utc(day=24, hour=9, minute=30, food_qty=100)
-    log2 = _make_foodlog_at_utc(day=24, hour=10, minute=30, food_qty=300)
+    log1 = make_foodlog(day=24, hour=9, minute=30, food_qty=100)
+    log2 = make_foodlog(day=24, hour=10, minute=30, food_qty=300)
 
     fixed_now = datetime(2025, 10, 25, 19, 16, 47, 123456, tzinfo=ZoneInfo("UTC"))
     monkeypatch.setattr(
@@ -88,8 +76,8 @@ def test_get_agent_suggestion_success(settings, monkeypatch):
     - return the model message content
     """
 
-    _make_foodlog_at_utc(day=25, hour=15, minute=30, food_qty=10)
-    _make_foodlog_at_utc(day=25, hour=16, minute=30, food_qty=20)
+    make_foodlog(day=25, hour=15, minute=30, food_qty=10)
+    make_foodlog(day=25, hour=16, minute=30, food_qty=20)
 
     # Freeze timezone.now() same as above
     fixed_now = datetime(2025, 10, 25, 19, 16, 47, 123456, tzinfo=ZoneInfo("UTC"))
@@ -114,7 +102,9 @@ def test_get_agent_suggestion_success(settings, monkeypatch):
     food_logs = list(FoodLog.objects.all().order_by("-feeddatetime")[:50])
     suggestion = get_agent_suggestion(food_logs)
 
-    assert suggestion == "next meal should be 15g of kibble"
+    assert suggestion.text == "next meal should be 15g of kibble"
+    assert suggestion.source == "agent"
+    assert not suggestion.pending
     assert mock_route.called
 
     request = mock_route.calls.last.request
@@ -164,7 +154,7 @@ def test_get_agent_suggestion_http_error_raises(settings):
     """
 
     # Minimal row so _build_prompt works
-    _make_foodlog_at_utc(day=11, month=5, hour=14, minute=30, food_qty=5)
+    make_foodlog(day=11, month=5, hour=14, minute=30, food_qty=5)
 
     settings.AGENT_ENDPOINT = "https://agent.example.test"
     settings.AGENT_ACCESS_KEY = "sekret-token"
@@ -191,12 +181,12 @@ def test_feeding_summary_respects_pt_days_and_window(monkeypatch):
     )
 
     # Before the window start: 2025-10-06T00:00:00-07:00 -> 07:00 UTC.
-    _make_foodlog_at_utc(day=6, hour=6, minute=59, food_qty=999)
+    make_foodlog(day=6, hour=6, minute=59, food_qty=999)
 
     # Inside window and exercises PT day bucketing.
-    _make_foodlog_at_utc(day=6, hour=7, food_qty=10)
-    _make_foodlog_at_utc(day=24, hour=6, minute=30, food_qty=20)  # PT day is 2025-10-23
-    _make_foodlog_at_utc(day=25, hour=7, minute=30, food_qty=30)
+    make_foodlog(day=6, hour=7, food_qty=10)
+    make_foodlog(day=24, hour=6, minute=30, food_qty=20)  # PT day is 2025-10-23
+    make_foodlog(day=25, hour=7, minute=30, food_qty=30)
 
     summary = _feeding_summary_last_20_days(list(FoodLog.objects.all()))
 
@@ -209,3 +199,173 @@ def test_feeding_summary_respects_pt_days_and_window(monkeypatch):
             DailyFoodTotal(pt_day="2025-10-25", food_total_g=30),
         ],
     )
+
+
+def test_call_agent_coalesced_shares_one_call_across_threads(monkeypatch):
+    """
+    Concurrent callers with the same fingerprint should share a single agent call.
+    """
+    calls = []
+
+    def slow_agent(prompt, context=""):
+        calls.append(prompt)
+        time.sleep(0.2)
+        return "15g"
+
+    monkeypatch.setattr("foodtracker.agent_service._call_agent_with_prompt", slow_agent)
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(
+            pool.map(
+                lambda i: _call_agent_coalesced(f"prompt {i}", "same-fingerprint"),
+                range(4),
+            )
+        )
+
+    assert results == ["15g"] * 4
+    assert len(calls) == 1
+
+
+def test_call_agent_coalesced_releases_lock_on_failure(monkeypatch):
+    """
+    A failed call must not be cached and must not leave the lock held.
+    """
+    responses = iter([httpx.ConnectError("down"), "20g"])
+
+    def flaky_agent(prompt, context=""):
+        response = next(responses)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    monkeypatch.setattr(
+        "foodtracker.agent_service._call_agent_with_prompt", flaky_agent
+    )
+
+    with pytest.raises(httpx.ConnectError):
+        _call_agent_coalesced("prompt", "fp")
+
+    assert _call_agent_coalesced("prompt", "fp") == "20g"
+
+
+def test_call_agent_coalesced_waiter_stops_at_its_deadline(monkeypatch):
+    """
+    A waiter given `stop_waiting_at` frees its thread then; the leader still
+    caches the answer for later.
+    """
+
+    def slow_agent(prompt, context=""):
+        time.sleep(0.3)
+        return "15g"
+
+    monkeypatch.setattr("foodtracker.agent_service._call_agent_with_prompt", slow_agent)
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        leader = pool.submit(_call_agent_coalesced, "prompt", "fp")
+        time.sleep(0.05)
+
+        started = time.monotonic()
+        with pytest.raises(AgentCallPending):
+            _call_agent_coalesced(
+                "prompt", "fp", stop_waiting_at=time.monotonic() + 0.05
+            )
+        assert time.monotonic() - started < 0.2
+
+        assert leader.result() == "15g"
+    assert peek_agent_suggestion("fp") == "15g"
+
+
+def test_background_pool_is_created_once_under_concurrent_first_use(monkeypatch):
+    monkeypatch.setattr("foodtracker.agent_service._background_pool", None)
+    created = []
+
+    class SlowPool(ThreadPoolExecutor):
+        def __init__(self, *args, **kwargs):
+            created.append(self)
+            time.sleep(0.05)
+            super().__init__(*args, **kwargs)
+
+    monkeypatch.setattr("foodtracker.agent_service.ThreadPoolExecutor", SlowPool)
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        pools = list(pool.map(lambda _: _get_background_pool(), range(4)))
+
+    assert len(created) == 1
+    assert all(p is pools[0] for p in pools)
+    pools[0].shutdown()
+
+
+@pytest.mark.django_db
+def test_local_suggestion_splits_remaining_median_across_meals_left(monkeypatch):
+    """
+    Typical day is 60g, 20g eaten so far today and it is 13:00 PT, so the
+    remaining 40g is split across the 17:00 and 21:00 meals.
+    """
+    fixed_now = datetime(2025, 10, 25, 20, 0, 0, tzinfo=ZoneInfo("UTC"))
+    monkeypatch.setattr("foodtracker.agent_service.timezone.now", lambda: fixed_now)
+
+    make_foodlog(day=23, hour=15, food_qty=60)
+    make_foodlog(day=24, hour=15, food_qty=60)
+    make_foodlog(day=25, hour=15, food_qty=20)
+
+    assert (
+        _local_suggestion(list(FoodLog.objects.all()))
+        == "About 20g next (20g of a typical 60g day so far)."
+    )
+
+
+@pytest.mark.django_db
+def test_local_suggestion_when_typical_day_already_eaten(monkeypatch):
+    fixed_now = datetime(2025, 10, 25, 20, 0, 0, tzinfo=ZoneInfo("UTC"))
+    monkeypatch.setattr("foodtracker.agent_service.timezone.now", lambda: fixed_now)
+
+    make_foodlog(day=24, hour=15, food_qty=30)
+    make_foodlog(day=25, hour=15, food_qty=40)
+
+    assert _local_suggestion(list(FoodLog.objects.all())) == (
+        "Biscuit has had 40g today, already a typical day's 35g - hold off until tomorrow."
+    )
+
+
+@pytest.mark.django_db
+def test_get_agent_suggestion_hedges_slow_agent_with_local_estimate(
+    settings, monkeypatch
+):
+    """
+    A slow agent should not hold the page past the latency budget: we get the
+    local estimate right away and the agent's answer lands in the cache later.
+    """
+    settings.AGENT_LATENCY_BUDGET_S = 0.05
+    make_foodlog(day=25, hour=15, food_qty=20)
+
+    def slow_agent(prompt, context=""):
+        time.sleep(0.3)
+        return "agent says 12g"
+
+    monkeypatch.setattr("foodtracker.agent_service._call_agent_with_prompt", slow_agent)
+
+    started = time.monotonic()
+    suggestion = get_agent_suggestion(list(FoodLog.objects.all()))
+
+    assert time.monotonic() - started < 0.25
+    assert suggestion.source == "local"
+    assert suggestion.pending
+    assert peek_agent_suggestion(suggestion.fingerprint) is None
+
+    time.sleep(0.5)
+    assert peek_agent_suggestion(suggestion.fingerprint) == "agent says 12g"
+
+
+@pytest.mark.django_db
+def test_get_agent_suggestion_falls_back_when_overloaded(monkeypatch):
+    make_foodlog(day=25, hour=15, food_qty=20)
+
+    def shed(*args, **kwargs):
+        raise AgentOverloaded("agent queue is full")
+
+    monkeypatch.setattr("foodtracker.agent_service._call_agent_coalesced", shed)
+
+    suggestion = get_agent_suggestion(list(FoodLog.objects.all()))
+
+    assert suggestion.source == "local"
+    assert not suggestion.pending
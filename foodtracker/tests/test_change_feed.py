@@ -0,0 +1,110 @@
+from datetime import datetime
+from unittest.mock import patch
+from zoneinfo import ZoneInfo
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from foodtracker.change_feed import FEED_VERSION_KEY, format_sse_event
+from foodtracker.models import FoodLog, FoodLogRow
+from foodtracker.tests.conftest import make_foodlog
+
+
+class TestFeedVersion(TestCase):
+    def test_new_rows_bump_feed_version(self):
+        self.assertIsNone(cache.get(FEED_VERSION_KEY))
+
+        # Only bumped once the row is committed
+        with self.captureOnCommitCallbacks(execute=True):
+            food_log = make_foodlog(day=11, hour=14, food_qty=10)
+            self.assertIsNone(cache.get(FEED_VERSION_KEY))
+        self.assertEqual(cache.get(FEED_VERSION_KEY), 1)
+
+        # Edits are not new rows
+        with self.captureOnCommitCallbacks(execute=True):
+            food_log.food_qty = 12
+            food_log.save()
+        self.assertEqual(cache.get(FEED_VERSION_KEY), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            make_foodlog(day=11, hour=15, food_qty=20)
+        self.assertEqual(cache.get(FEED_VERSION_KEY), 2)
+
+
+class TestFormatSseEvent(TestCase):
+    def test_event_carries_rendered_row(self):
+        row = FoodLogRow(
+            7, datetime(2025, 5, 11, 14, 30, tzinfo=ZoneInfo("UTC")), 42, 37, True
+        )
+
+        event = format_sse_event(row)
+
+        self.assertTrue(event.startswith("id: 7\nevent: foodlog\ndata: "))
+        self.assertTrue(event.endswith("\n\n"))
+        self.assertIn('data: <tr data-log-id="7">\n', event)
+        self.assertIn("data: <td>42</td>\n", event)
+        # Every payload line is a data: line, so the row survives as one event
+        for line in event.rstrip("\n").split("\n")[2:]:
+            self.assertTrue(line.startswith("data: "), line)
+
+
+@override_settings(FOODLOG_EVENTS_MAX_S=0)
+class TestFoodLogEventsView(TestCase):
+    def setUp(self):
+        self.first = make_foodlog(day=11, hour=14, food_qty=10)
+        self.second = make_foodlog(day=11, hour=15, food_qty=20)
+        self.third = make_foodlog(day=11, hour=16, food_qty=30)
+
+    async def _stream(self, **kwargs):
+        response = await self.async_client.get(reverse("food_log_events"), **kwargs)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        chunks = [chunk async for chunk in response.streaming_content]
+        return b"".join(chunks).decode()
+
+    async def test_streams_rows_after_given_id_oldest_first(self):
+        body = await self._stream(query_params={"after": self.first.id})
+
+        self.assertTrue(body.startswith("retry: 3000\n\n"))
+        self.assertNotIn(f"id: {self.first.id}\n", body)
+        self.assertLess(
+            body.index(f"id: {self.second.id}\n"), body.index(f"id: {self.third.id}\n")
+        )
+
+    async def test_resumes_from_last_event_id(self):
+        body = await self._stream(
+            query_params={"after": self.first.id},
+            headers={"Last-Event-ID": str(self.second.id)},
+        )
+
+        self.assertNotIn(f"id: {self.second.id}\n", body)
+        self.assertIn(f"id: {self.third.id}\n", body)
+
+    async def test_without_position_only_new_rows_are_sent(self):
+        body = await self._stream()
+        self.assertNotIn("event: foodlog", body)
+
+    def test_wsgi_requests_are_told_not_to_retry(self):
+        response = self.client.get(reverse("food_log_events"))
+        self.assertEqual(response.status_code, 204)
+
+
+@patch("foodtracker.views.get_agent_suggestion", return_value="agent says 15g")
+class TestLiveUpdatesSubscription(TestCase):
+    def test_wsgi_page_does_not_subscribe(self, _suggestion):
+        response = self.client.get(reverse("list_food_logs"))
+        self.assertNotContains(response, "data-events-url")
+
+    async def test_asgi_page_subscribes_after_newest_row(self, _suggestion):
+        food_log = await FoodLog.objects.acreate(
+            feeddatetime=datetime(2025, 5, 11, 14, 30, 0, tzinfo=ZoneInfo("UTC")),
+            food_qty=10,
+            water_qty=0,
+        )
+
+        response = await self.async_client.get(reverse("list_food_logs"))
+        self.assertContains(
+            response,
+            f'data-events-url="{reverse("food_log_events")}?after={food_log.id}"',
+        )
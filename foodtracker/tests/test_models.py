@@ -2,7 +2,7 @@ from django.test import TestCase
 from django.utils import timezone
 from datetime import datetime
 from zoneinfo import ZoneInfo
-from foodtracker.models import FoodLog
+from foodtracker.models import FoodLog, FoodLogRow
 
 
 class TestFoodLogModel(TestCase):
@@ -30,3 +30,28 @@ class TestFoodLogModel(TestCase):
         self.assertTrue(timezone.is_aware(retrieved_log.feeddatetime))
         # Both datetime.timezone.utc and ZoneInfo("UTC") are valid UTC timezone objects
         self.assertEqual(str(retrieved_log.feeddatetime.tzinfo), "UTC")
+
+
+class TestFoodLogRow(TestCase):
+    def test_row_matches_model_for_llm_dict(self):
+        food_log = FoodLog.objects.create(
+            feeddatetime=datetime(2025, 5, 11, 14, 30, 0, tzinfo=ZoneInfo("UTC")),
+            food_qty=50,
+            water_qty=20,
+            teeth_brush=True,
+        )
+
+        values = FoodLog.objects.values_list(*FoodLogRow.FIELDS).get(id=food_log.id)
+        row = FoodLogRow(*values)
+
+        self.assertEqual(row.id, food_log.id)
+        self.assertEqual(row.feeddatetime, food_log.feeddatetime)
+        self.assertEqual(str(row.feeddatetime_pt.tzinfo), "America/Los_Angeles")
+        self.assertEqual(row.to_llm_dict(), food_log.to_llm_dict())
+        self.assertEqual(row.to_llm_dict()["feeddatetime"], "2025-05-11T07:30:00-07:00")
+
+    def test_row_has_no_instance_dict(self):
+        row = FoodLogRow(
+            1, datetime(2025, 5, 11, 14, 30, tzinfo=ZoneInfo("UTC")), 1, 2, False
+        )
+        self.assertFalse(hasattr(row, "__dict__"))
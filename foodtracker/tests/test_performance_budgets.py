@@ -0,0 +1,208 @@
+"""
+Per-endpoint performance budgets.
+
+Each endpoint declares how many DB queries and agent calls it may make, how
+big its response may be and how long it may take with an instant (mocked)
+agent. A change that blows a budget - an N+1 query, a second agent call, a
+bloated template - fails here with a table of budget vs actual and the SQL
+that ran. Raise a budget deliberately, in the same change that needs it.
+"""
+
+import re
+from dataclasses import dataclass, fields
+from datetime import datetime, timedelta
+from time import perf_counter
+from zoneinfo import ZoneInfo
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from foodtracker.models import FoodLog
+
+# Enough rows to fill the 50-row window so per-row queries would show up.
+SEEDED_ROWS = 60
+
+
+@dataclass(frozen=True)
+class Budget:
+    max_queries: int
+    max_agent_calls: int
+    max_response_bytes: int
+    max_wall_time_s: float
+
+
+@dataclass
+class Measurement:
+    queries: int
+    agent_calls: int
+    response_bytes: int
+    wall_time_s: float
+
+
+BUDGETS = {
+    # Steady state: the recent-logs window comes from the cache.
+    "GET /": Budget(
+        max_queries=0,
+        max_agent_calls=1,
+        max_response_bytes=18_000,
+        max_wall_time_s=0.5,
+    ),
+    "POST /add/ valid": Budget(
+        max_queries=1,
+        max_agent_calls=0,
+        max_response_bytes=0,
+        max_wall_time_s=0.2,
+    ),
+    "POST /add/ invalid": Budget(
+        max_queries=0,
+        max_agent_calls=0,
+        max_response_bytes=18_000,
+        max_wall_time_s=0.5,
+    ),
+}
+
+
+def assert_within_budget(name: str, budget: Budget, measured: Measurement, sql=()):
+    """
+    Fail with a budget-vs-actual table if any metric is over budget.
+    """
+    over = []
+    lines = [f"{'metric':<16}{'budget':>12}{'actual':>12}"]
+    for field in fields(Measurement):
+        limit = getattr(budget, f"max_{field.name}")
+        actual = getattr(measured, field.name)
+        flag = ""
+        if actual > limit:
+            over.append(field.name)
+            flag = "  <-- over budget"
+        if isinstance(actual, float):
+            lines.append(f"{field.name:<16}{limit:>12.3f}{actual:>12.3f}{flag}")
+        else:
+            lines.append(f"{field.name:<16}{limit:>12}{actual:>12}{flag}")
+
+    if over:
+        message = [f"{name} is over its performance budget ({', '.join(over)}):"]
+        message += lines
+        if sql:
+            message.append("Queries:")
+            message += [f"  {statement}" for statement in sql]
+        pytest.fail("\n".join(message), pytrace=False)
+
+
+@pytest.fixture
+def agent_calls(monkeypatch):
+    """
+    Instant stand-in for the agent that counts how often it is called.
+    """
+    calls = []
+
+    def fake_agent(prompt, context=""):
+        calls.append(prompt)
+        return "next meal should be 15g of kibble"
+
+    monkeypatch.setattr("foodtracker.agent_service._call_agent_with_prompt", fake_agent)
+    return calls
+
+
+@pytest.fixture
+def seeded_logs(db):
+    start = datetime(2025, 10, 1, tzinfo=ZoneInfo("UTC"))
+    FoodLog.objects.bulk_create(
+        FoodLog(
+            feeddatetime=start + timedelta(hours=6 * i),
+            food_qty=20,
+            water_qty=10,
+            teeth_brush=i % 4 == 0,
+        )
+        for i in range(SEEDED_ROWS)
+    )
+
+
+def _measure(client, agent_calls, method, url, data=None):
+    with CaptureQueriesContext(connection) as ctx:
+        started = perf_counter()
+        response = getattr(client, method)(url, data)
+        wall_time_s = perf_counter() - started
+
+    measured = Measurement(
+        queries=len(ctx.captured_queries),
+        agent_calls=len(agent_calls),
+        response_bytes=len(response.content),
+        wall_time_s=wall_time_s,
+    )
+    return response, measured, [query["sql"] for query in ctx.captured_queries]
+
+
+@pytest.mark.django_db
+def test_list_food_logs_budget(
+    client, agent_calls, seeded_logs, django_capture_on_commit_callbacks
+):
+    # Warm up templates, URL resolvers and the recent-logs cache so wall time
+    # measures the request.
+    client.get(reverse("list_food_logs"))
+    agent_calls.clear()
+    with django_capture_on_commit_callbacks(execute=True):
+        new_log = FoodLog.objects.create(
+            feeddatetime=datetime(2025, 10, 20, tzinfo=ZoneInfo("UTC")),
+            food_qty=5,
+            water_qty=5,
+        )
+
+    response, measured, sql = _measure(
+        client, agent_calls, "get", reverse("list_food_logs")
+    )
+
+    assert response.status_code == 200
+    assert f'data-log-id="{new_log.id}"' in response.content.decode()
+    assert_within_budget("GET /", BUDGETS["GET /"], measured, sql)
+
+
+@pytest.mark.django_db
+def test_add_food_log_valid_budget(client, agent_calls, seeded_logs):
+    response, measured, sql = _measure(
+        client,
+        agent_calls,
+        "post",
+        reverse("add_food_log"),
+        {"food_qty": 20, "water_qty": 10},
+    )
+
+    assert response.status_code == 302
+    assert_within_budget("POST /add/ valid", BUDGETS["POST /add/ valid"], measured, sql)
+
+
+@pytest.mark.django_db
+def test_add_food_log_invalid_budget(client, agent_calls, seeded_logs):
+    client.get(reverse("list_food_logs"))
+    agent_calls.clear()
+
+    response, measured, sql = _measure(
+        client,
+        agent_calls,
+        "post",
+        reverse("add_food_log"),
+        {"food_qty": 150, "water_qty": 10},
+    )
+
+    assert response.status_code == 200
+    assert_within_budget(
+        "POST /add/ invalid", BUDGETS["POST /add/ invalid"], measured, sql
+    )
+
+
+def test_assert_within_budget_reports_diff():
+    budget = Budget(
+        max_queries=1, max_agent_calls=1, max_response_bytes=100, max_wall_time_s=1.0
+    )
+    measured = Measurement(queries=3, agent_calls=1, response_bytes=50, wall_time_s=0.1)
+
+    with pytest.raises(pytest.fail.Exception) as excinfo:
+        assert_within_budget("GET /", budget, measured, ["SELECT 1", "SELECT 2"])
+
+    message = str(excinfo.value)
+    assert "GET / is over its performance budget (queries):" in message
+    assert re.search(r"queries +1 +3  <-- over budget", message)
+    assert re.search(r"agent_calls +1 +1\n", message)
+    assert "  SELECT 2" in message
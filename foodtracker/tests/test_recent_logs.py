@@ -0,0 +1,181 @@
+from unittest.mock import patch
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from foodtracker import recent_logs
+from foodtracker.models import FoodLog
+from foodtracker.recent_logs import get_recent_logs
+from foodtracker.tests.conftest import make_foodlog
+
+
+class TestRecentLogsCache(TestCase):
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            make_foodlog(day=11, hour=14, food_qty=100)
+            make_foodlog(day=11, hour=15, food_qty=300)
+
+    def _food_qtys(self):
+        return [row.food_qty for row in get_recent_logs()]
+
+    def test_second_read_is_served_from_cache(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(self._food_qtys(), [300, 100])
+        with self.assertNumQueries(0):
+            self.assertEqual(self._food_qtys(), [300, 100])
+
+    def test_insert_prepends_without_a_query(self):
+        get_recent_logs()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            make_foodlog(day=11, hour=16, food_qty=500)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self._food_qtys(), [500, 300, 100])
+
+    def test_insert_trims_window_to_limit(self):
+        with patch.object(recent_logs, "RECENT_LOGS_LIMIT", 2):
+            get_recent_logs()
+            with self.captureOnCommitCallbacks(execute=True):
+                make_foodlog(day=11, hour=16, food_qty=500)
+
+            with self.assertNumQueries(0):
+                self.assertEqual(self._food_qtys(), [500, 300])
+
+    def test_same_time_insert_matches_a_requery(self):
+        get_recent_logs()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            make_foodlog(day=11, hour=15, food_qty=301)
+        self.assertEqual(self._food_qtys(), [301, 300, 100])
+
+        recent_logs.invalidate_recent_logs()
+        with self.assertNumQueries(1):
+            self.assertEqual(self._food_qtys(), [301, 300, 100])
+
+    def test_backdated_insert_is_requeried(self):
+        get_recent_logs()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            make_foodlog(day=1, hour=15, food_qty=7)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(self._food_qtys(), [300, 100, 7])
+
+    def test_concurrent_publish_falls_back_to_requery(self):
+        """
+        If another writer published between our read and our publish, our
+        window would miss their row, so we must not publish it.
+        """
+        get_recent_logs()
+        version = recent_logs._current_version()
+        # The other writer's window is out; its version set is still to come
+        cache.add(recent_logs._rows_key(version + 1), [], timeout=None)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            make_foodlog(day=11, hour=16, food_qty=500)
+        cache.set(recent_logs.VERSION_KEY, version + 1, timeout=None)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(self._food_qtys(), [500, 300, 100])
+
+    def test_invalidation_during_publish_falls_back_to_requery(self):
+        """
+        An edit that bumps the version between our read and our publish must
+        not be hidden behind our window, which still has the old row.
+        """
+        get_recent_logs()
+        edited = FoodLog.objects.get(food_qty=100)
+        real_current_version = recent_logs._current_version
+
+        def racing_current_version():
+            version = real_current_version()
+            FoodLog.objects.filter(pk=edited.pk).update(food_qty=101)
+            recent_logs.invalidate_recent_logs()  # the other writer
+            return version
+
+        with patch.object(recent_logs, "_current_version", racing_current_version):
+            with self.captureOnCommitCallbacks(execute=True):
+                make_foodlog(day=11, hour=16, food_qty=500)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(self._food_qtys(), [500, 300, 101])
+
+    def test_update_and_delete_invalidate(self):
+        get_recent_logs()
+        food_log = FoodLog.objects.get(food_qty=300)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            food_log.food_qty = 301
+            food_log.save()
+        with self.assertNumQueries(1):
+            self.assertEqual(self._food_qtys(), [301, 100])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            food_log.delete()
+        with self.assertNumQueries(1):
+            self.assertEqual(self._food_qtys(), [100])
+
+    def test_rolled_back_insert_never_reaches_the_cache(self):
+        get_recent_logs()
+
+        # Callbacks captured but not executed, as on rollback
+        with self.captureOnCommitCallbacks(execute=False):
+            make_foodlog(day=11, hour=16, food_qty=500)
+
+        self.assertEqual(self._food_qtys(), [300, 100])
+
+
+class TestRecentLogsCacheBackends(SimpleTestCase):
+    def test_process_local_cache_keeps_window_briefly(self):
+        self.assertEqual(
+            recent_logs._cache_ttl(), settings.RECENT_LOGS_LOCAL_CACHE_TTL_S
+        )
+
+    @override_settings(
+        CACHES={
+            "default": {
+                "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+                "LOCATION": "django_cache",
+            }
+        }
+    )
+    def test_shared_db_cache_keeps_window_long(self):
+        self.assertEqual(recent_logs._cache_ttl(), settings.RECENT_LOGS_CACHE_TTL_S)
+
+
+@override_settings(
+    CACHES={
+        "default": {
+            "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+            "LOCATION": "django_cache",
+        }
+    }
+)
+class TestRecentLogsOnDbCache(TestCase):
+    """
+    The db backend is what runs in production: no atomic incr, and every
+    cache read is itself a query.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        call_command("createcachetable", verbosity=0)
+
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            make_foodlog(day=11, hour=14, food_qty=100)
+        get_recent_logs()
+
+    def test_steady_state_read_is_two_cache_reads(self):
+        with self.assertNumQueries(2):
+            self.assertEqual([row.food_qty for row in get_recent_logs()], [100])
+
+    def test_insert_prepends_without_a_foodlog_query(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            make_foodlog(day=11, hour=16, food_qty=500)
+
+        with self.assertNumQueries(2):
+            self.assertEqual([row.food_qty for row in get_recent_logs()], [500, 100])
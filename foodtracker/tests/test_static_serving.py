@@ -0,0 +1,142 @@
+import gzip
+import json
+
+import pytest
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+
+from foodtracker import storage
+
+COMPRESSED_STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {
+        "BACKEND": "foodtracker.storage.CompressedManifestStaticFilesStorage"
+    },
+}
+
+
+@pytest.fixture(scope="module")
+def collected_static(tmp_path_factory):
+    """
+    Run collectstatic once with the real storage into a temp STATIC_ROOT.
+    """
+    static_root = tmp_path_factory.mktemp("static")
+    with override_settings(STATIC_ROOT=static_root, STORAGES=COMPRESSED_STORAGES):
+        call_command("collectstatic", interactive=False, verbosity=0)
+    manifest = json.loads((static_root / "staticfiles.json").read_text())
+    return static_root, manifest["paths"]
+
+
+@pytest.fixture
+def static_settings(settings, collected_static):
+    static_root, paths = collected_static
+    settings.STATIC_ROOT = static_root
+    settings.STORAGES = COMPRESSED_STORAGES
+    return paths
+
+
+def test_collectstatic_writes_hashed_and_precompressed_files(collected_static):
+    static_root, paths = collected_static
+
+    hashed_js = paths["foodtracker/js/food_log.js"]
+    assert hashed_js != "foodtracker/js/food_log.js"
+
+    original = (static_root / hashed_js).read_bytes()
+    assert gzip.decompress((static_root / f"{hashed_js}.gz").read_bytes()) == original
+    assert (static_root / f"{hashed_js}.br").exists() == (storage.brotli is not None)
+
+    # Tiny files aren't worth compressing
+    assert not (static_root / f"{paths['foodtracker/css/food_log.css']}.gz").exists()
+
+
+def test_hashed_asset_served_gzipped_with_far_future_cache(client, static_settings):
+    hashed_css = static_settings["foodtracker/vendor/bootstrap-5.3.8/bootstrap.min.css"]
+
+    response = client.get(f"/static/{hashed_css}", HTTP_ACCEPT_ENCODING="gzip, deflate")
+
+    assert response.status_code == 200
+    assert response["Content-Type"] == "text/css"
+    assert response["Content-Encoding"] == "gzip"
+    assert response["Vary"] == "Accept-Encoding"
+    assert response["Cache-Control"] == "public, max-age=31536000, immutable"
+    body = gzip.decompress(b"".join(response.streaming_content))
+    assert body.startswith(b'@charset "UTF-8";')
+
+
+@pytest.mark.skipif(storage.brotli is None, reason="brotli not installed")
+def test_brotli_preferred_when_accepted(client, static_settings):
+    hashed_js = static_settings["foodtracker/vendor/chart.js-4.4.0/chart.umd.min.js"]
+
+    response = client.get(f"/static/{hashed_js}", HTTP_ACCEPT_ENCODING="gzip, br")
+
+    assert response["Content-Encoding"] == "br"
+    assert response["Content-Type"] == "text/javascript"
+
+
+def test_asset_served_uncompressed_without_accept_encoding(client, static_settings):
+    hashed_css = static_settings["foodtracker/vendor/bootstrap-5.3.8/bootstrap.min.css"]
+
+    response = client.get(f"/static/{hashed_css}")
+
+    assert response.status_code == 200
+    assert not response.has_header("Content-Encoding")
+
+
+def test_unhashed_name_is_revalidated(client, static_settings):
+    response = client.get("/static/foodtracker/js/food_log.js")
+
+    assert response.status_code == 200
+    assert response["Cache-Control"] == "no-cache"
+
+
+@pytest.mark.django_db
+def test_page_links_hashed_assets_after_collectstatic(client, static_settings):
+    response = client.get("/")
+
+    assert response.status_code == 200
+    hashed_css = static_settings["foodtracker/vendor/bootstrap-5.3.8/bootstrap.min.css"]
+    assert f'href="/static/{hashed_css}"' in response.content.decode()
+
+
+@pytest.mark.django_db
+def test_page_renders_before_collectstatic(client, settings):
+    """
+    With DEBUG off and no manifest yet (runserver on a fresh checkout) the
+    page links the plain names, which are served from the app directory.
+    """
+    settings.DEBUG = False
+    settings.STORAGES = COMPRESSED_STORAGES
+
+    response = client.get("/")
+
+    assert response.status_code == 200
+    assert 'href="/static/foodtracker/css/food_log.css"' in response.content.decode()
+    css = client.get("/static/foodtracker/css/food_log.css")
+    assert css.status_code == 200
+    assert css["Cache-Control"] == "no-cache"
+
+
+@pytest.mark.parametrize(
+    "path",
+    [
+        "foodtracker/js/missing.js",
+        "../settings.py",
+        "foodtracker/js/food_log.js.gz",
+    ],
+)
+def test_serve_static_404s(client, static_settings, path):
+    assert client.get(f"/static/{path}").status_code == 404
+
+
+def test_service_worker_caches_hashed_shell(client, static_settings):
+    response = client.get(reverse("service_worker"))
+
+    assert response.status_code == 200
+    assert response["Content-Type"] == "application/javascript"
+    assert response["Cache-Control"] == "no-cache"
+    content = response.content.decode()
+    hashed_js = static_settings["foodtracker/js/food_log.js"]
+    assert f'"/static/{hashed_js}"' in content
+    assert "const CACHE_NAME = 'foodtracker-shell-" in content
+    assert 'new RegExp("\\\\.[0-9a-f]{12}\\\\.[^./]+$")' in content
@@ -1,37 +1,22 @@
 from unittest.mock import patch
-from datetime import datetime
-from zoneinfo import ZoneInfo
 
 from django.test import TestCase, Client
 from django.urls import reverse
 from django.utils import timezone
 
-from foodtracker.models import FoodLog
-from foodtracker.views import get_food_logs
-
+from django.core.cache import cache
 
-def _make_foodlog(
-    *,
-    hour: int,
-    food_qty: int,
-    water_qty: int,
-) -> FoodLog:
-    """
-    Create a FoodLog row for testing.
-    """
-    return FoodLog.objects.create(
-        feeddatetime=datetime(2025, 5, 11, hour, 30, 0, tzinfo=ZoneInfo("UTC")),
-        food_qty=food_qty,
-        water_qty=water_qty,
-        teeth_brush=False,
-    )
+from foodtracker.agent_service import AgentSuggestion
+from foodtracker.models import FoodLog, FoodLogRow
+from foodtracker.views import get_food_logs
+from foodtracker.tests.conftest import make_foodlog
 
 
 class TestListFoodLogsView(TestCase):
     def setUp(self):
         self.client = Client()
-        _make_foodlog(hour=14, food_qty=100, water_qty=200)
-        _make_foodlog(hour=15, food_qty=300, water_qty=400)
+        make_foodlog(month=5, day=11, hour=14, food_qty=100, minute=30, water_qty=200)
+        make_foodlog(month=5, day=11, hour=15, food_qty=300, minute=30, water_qty=400)
 
     @patch("foodtracker.views.get_agent_suggestion", return_value="stub suggestion")
     def test_list_food_logs(self, mock_agent):
@@ -62,6 +47,44 @@ class TestListFoodLogsView(TestCase):
         # And the view should include the form (implicit check: submit button is present)
         self.assertIn('<form id="food-log-form"', content)
 
+        # Assets are self-hosted, nothing comes from a CDN
+        self.assertIn('href="/static/foodtracker/vendor/bootstrap-5.3.8/', content)
+        self.assertNotIn("cdn.jsdelivr.net", content)
+
+    @patch(
+        "foodtracker.views.get_agent_suggestion",
+        return_value=AgentSuggestion(
+            text="About 20g next", fingerprint="abc123", source="local", pending=True
+        ),
+    )
+    def test_list_food_logs_pending_local_estimate(self, mock_agent):
+        response = self.client.get(reverse("list_food_logs"))
+        content = response.content.decode()
+
+        self.assertIn("Estimate:", content)
+        self.assertIn("About 20g next", content)
+        self.assertIn(
+            'data-poll-url="%s"' % reverse("agent_suggestion", args=["abc123"]),
+            content,
+        )
+
+
+class TestAgentSuggestionView(TestCase):
+    def test_pending_suggestion_returns_no_content(self):
+        response = self.client.get(reverse("agent_suggestion", args=["abc123"]))
+        self.assertEqual(response.status_code, 204)
+
+    def test_finished_suggestion_is_rendered(self):
+        cache.set("agent:result:abc123", "next meal should be 15g")
+
+        response = self.client.get(reverse("agent_suggestion", args=["abc123"]))
+
+        self.assertEqual(response.status_code, 200)
+        content = response.content.decode()
+        self.assertIn("Agent suggests:", content)
+        self.assertIn("next meal should be 15g", content)
+        self.assertNotIn("data-poll-url", content)
+
 
 class TestAddFoodLogView(TestCase):
     def setUp(self):
@@ -143,17 +166,19 @@ class TestAddFoodLogView(TestCase):
 
 class TestGetFoodLogs(TestCase):
     def setUp(self):
-        _make_foodlog(hour=15, food_qty=300, water_qty=400)
-        _make_foodlog(hour=14, food_qty=100, water_qty=200)
+        make_foodlog(month=5, day=11, hour=15, food_qty=300, minute=30, water_qty=400)
+        make_foodlog(month=5, day=11, hour=14, food_qty=100, minute=30, water_qty=200)
 
     def test_get_food_logs_returns_sorted_list(self):
         """
-        get_food_logs() should return a list of FoodLog objects,
-        newest first, limited to 50.
+        get_food_logs() should return a list of FoodLogRow objects,
+        newest first, limited to 50, in a single query.
         """
-        logs = get_food_logs()
+        with self.assertNumQueries(1):
+            logs = get_food_logs()
 
         self.assertEqual(len(logs), 2)
+        self.assertIsInstance(logs[0], FoodLogRow)
 
         self.assertEqual(logs[0].food_qty, 300)
         self.assertEqual(logs[1].food_qty, 100)
@@ -0,0 +1,92 @@
+import importlib
+
+import httpx
+import pytest
+import respx
+from django.core.cache import cache
+from django.test import Client
+
+from foodtracker import warmup
+from foodtracker.recent_logs import VERSION_KEY
+from foodtracker.warmup import warm_worker
+
+
+@pytest.fixture(autouse=True)
+def _fresh_warmup_state(monkeypatch):
+    monkeypatch.setattr(warmup, "_worker_ready_at", None)
+    monkeypatch.setattr(warmup, "_first_request_done", False)
+
+
+@pytest.mark.django_db
+@respx.mock
+def test_warm_worker_fills_caches_and_warms_agent_endpoints(settings):
+    settings.AGENT_ENDPOINTS = ["https://a.test", "https://b.test"]
+    a = respx.head("https://a.test").mock(return_value=httpx.Response(404))
+    b = respx.head("https://b.test").mock(side_effect=httpx.ConnectError("down"))
+
+    timings = warm_worker()
+
+    assert list(timings) == ["database", "templates", "recent_logs", "agent_pool"]
+    assert a.called and b.called
+    assert warmup._worker_ready_at is not None
+
+    assert cache.get(VERSION_KEY) is not None
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("keep_connection", [True, False])
+def test_warm_worker_keeps_connection_only_when_asked(monkeypatch, keep_connection):
+    monkeypatch.setattr(warmup, "_warm_agent_pool", lambda: None)
+    closed = []
+    monkeypatch.setattr(warmup.connections, "close_all", lambda: closed.append(1))
+
+    warm_worker(keep_connection=keep_connection)
+
+    assert bool(closed) is not keep_connection
+
+
+@pytest.mark.django_db
+def test_warm_worker_survives_a_failing_step(monkeypatch, caplog):
+    def broken():
+        raise RuntimeError("no such table: foodlog")
+
+    monkeypatch.setattr(warmup, "get_recent_logs", broken)
+    monkeypatch.setattr(warmup, "_warm_agent_pool", lambda: None)
+
+    with caplog.at_level("WARNING", logger="foodtracker.warmup"):
+        timings = warm_worker()
+
+    assert "recent_logs" in timings
+    assert "warm-up step recent_logs failed" in caplog.text
+
+
+@pytest.mark.django_db
+def test_first_request_is_logged_once(caplog):
+    client = Client()
+    with caplog.at_level("INFO", logger="foodtracker.warmup"):
+        client.get("/")
+        client.get("/")
+
+    messages = [
+        r.getMessage() for r in caplog.records if r.name == "foodtracker.warmup"
+    ]
+    assert len(messages) == 1
+    assert messages[0].startswith("first request GET / took ")
+
+
+def test_gunicorn_config_maps_worker_class(settings, monkeypatch):
+    import dogfood.gunicorn_config as gunicorn_config
+
+    settings.SERVER_WORKER_CLASS = "uvicorn"
+    importlib.reload(gunicorn_config)
+    assert gunicorn_config.worker_class == "uvicorn_worker.UvicornWorker"
+    assert gunicorn_config.wsgi_app == "dogfood.asgi:application"
+    assert gunicorn_config.preload_app is True
+
+    settings.SERVER_WORKER_CLASS = "eventlet"
+    with pytest.raises(ValueError):
+        importlib.reload(gunicorn_config)
+
+    settings.SERVER_WORKER_CLASS = "gthread"
+    importlib.reload(gunicorn_config)
+    assert gunicorn_config.wsgi_app == "dogfood.wsgi:application"
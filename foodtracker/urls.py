@@ -4,4 +4,11 @@ from foodtracker import views
 urlpatterns = [
     path("", views.list_food_logs, name="list_food_logs"),
     path("add/", views.add_food_log, name="add_food_log"),
+    path("events/", views.food_log_events, name="food_log_events"),
+    path("sw.js", views.service_worker, name="service_worker"),
+    path(
+        "suggestion/<str:fingerprint>/",
+        views.agent_suggestion,
+        name="agent_suggestion",
+    ),
 ]
@@ -1,25 +1,46 @@
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, StreamingHttpResponse
 from django.shortcuts import render, redirect
 from django.utils import timezone
 
-from foodtracker.agent_service import get_agent_suggestion
-from foodtracker.models import FoodLog
+from foodtracker.agent_service import (
+    AgentSuggestion,
+    get_agent_suggestion,
+    peek_agent_suggestion,
+)
+from foodtracker.change_feed import food_log_event_stream
+from foodtracker.static_serving import HASHED_NAME_RE, shell_asset_urls
+from foodtracker.models import FoodLog, FoodLogRow
+from foodtracker.recent_logs import get_recent_logs
 from foodtracker.forms import FoodLogForm
 
 
-def get_food_logs() -> list[FoodLog]:
+def get_food_logs() -> list[FoodLogRow]:
     """Helper function to get the common context for food log views."""
-    return list(FoodLog.objects.all().order_by("-feeddatetime")[:50])
+    return get_recent_logs()
+
+
+def _serves_live_updates(request) -> bool:
+    # food_log_events only streams over ASGI, so only point the page at it there.
+    return isinstance(request, ASGIRequest)
 
 
 def list_food_logs(request):
     """
     Display all food logs with a form to add new ones — and try to include a GenAI suggestion.
-    If any Exception we fall back to '(agent error: ...)'.
+    A slow or busy agent is hedged with a local estimate inside
+    get_agent_suggestion; on any other Exception we fall back to
+    '(agent error: ...)'.
     """
     food_logs = get_food_logs()
     ctx = {}
     ctx["form"] = FoodLogForm()
     ctx["food_logs"] = food_logs
+    ctx["live_updates"] = _serves_live_updates(request)
 
     try:
         ctx["agent_suggestion"] = get_agent_suggestion(food_logs)
@@ -40,9 +61,75 @@ def add_food_log(request):
             return redirect("list_food_logs")
 
         # If form is invalid, show the form with errors
-        ctx = {"form": form, "food_logs": get_food_logs()}
+        ctx = {
+            "form": form,
+            "food_logs": get_food_logs(),
+            "live_updates": _serves_live_updates(request),
+        }
 
         return render(request, "foodtracker/food_log_list.html", ctx)
 
     # For GET requests, redirect to the list view
     return redirect("list_food_logs")
+
+
+def agent_suggestion(request, fingerprint):
+    """
+    Polled by the page while it shows a local estimate: returns the agent's
+    answer once the background call has finished, 204 until then.
+    """
+    text = peek_agent_suggestion(fingerprint)
+    if text is None:
+        return HttpResponse(status=204)
+
+    ctx = {"agent_suggestion": AgentSuggestion(text=text, fingerprint=fingerprint)}
+    return render(request, "foodtracker/partials/agent_suggestion.html", ctx)
+
+
+async def food_log_events(request):
+    """
+    Server-sent event stream of rows saved after ?after=<id> (or the
+    Last-Event-ID the browser sends when it reconnects).
+
+    Only served over ASGI: under a sync WSGI worker a stream would hold the
+    whole worker, so we answer 204, which tells EventSource to stop retrying.
+    """
+    if not isinstance(request, ASGIRequest):
+        return HttpResponse(status=204)
+
+    last_id = request.headers.get("Last-Event-ID") or request.GET.get("after")
+    try:
+        last_id = int(last_id)
+    except (TypeError, ValueError):
+        latest = await FoodLog.objects.order_by("-id").values_list("id").afirst()
+        last_id = latest[0] if latest else 0
+
+    response = StreamingHttpResponse(
+        food_log_event_stream(last_id), content_type="text/event-stream"
+    )
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+def service_worker(request):
+    """
+    The service worker script. It is served from the site root so its scope
+    covers the whole app, and is never cached itself so a deploy with new
+    asset hashes is picked up on the next visit.
+    """
+    assets = shell_asset_urls()
+    ctx = {
+        "cache_version": hashlib.sha256("\n".join(assets).encode()).hexdigest()[:12],
+        "shell_assets_json": json.dumps(assets),
+        "hashed_name_re_json": json.dumps(HASHED_NAME_RE.pattern),
+        "static_url": "/" + settings.STATIC_URL.lstrip("/"),
+    }
+    response = render(
+        request,
+        "foodtracker/service_worker.js",
+        ctx,
+        content_type="application/javascript",
+    )
+    response["Cache-Control"] = "no-cache"
+    return response
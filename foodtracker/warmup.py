@@ -0,0 +1,131 @@
+import logging
+from time import monotonic
+
+import httpx
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.db import connections
+from django.template.loader import get_template
+
+from foodtracker.agent_endpoints import get_agent_endpoints, transport
+from foodtracker.recent_logs import get_recent_logs
+
+logger = logging.getLogger(__name__)
+
+WARM_TEMPLATES = (
+    "foodtracker/food_log_list.html",
+    "foodtracker/partials/food_log_form.html",
+    "foodtracker/partials/food_log_row.html",
+    "foodtracker/partials/agent_suggestion.html",
+)
+
+_worker_ready_at: float | None = None
+_first_request_done = False
+
+
+def _warm_templates() -> None:
+    # The cached template loader keeps compiled templates per process.
+    for name in WARM_TEMPLATES:
+        get_template(name)
+
+
+def _warm_database() -> None:
+    connections["default"].ensure_connection()
+
+
+def _warm_agent_pool() -> None:
+    """
+    Start the agent event loop and client, and open a keep-alive connection
+    to each endpoint so the first agent call skips DNS and TLS. Any status
+    will do; an unreachable endpoint just stays cold.
+    """
+    transport.start()
+    for endpoint in get_agent_endpoints():
+        if not endpoint:
+            continue
+        try:
+            transport.head(endpoint, timeout=2.0)
+        except httpx.HTTPError:
+            logger.info("agent endpoint %s not reachable during warm-up", endpoint)
+
+
+def warm_worker(keep_connection: bool = False) -> dict[str, float]:
+    """
+    Run in each freshly forked worker before it accepts requests. Returns
+    how long each step took, in seconds. A step that fails is logged and
+    skipped; the worker still boots and pays that cost on first use.
+
+    Django connections belong to the thread that opened them. Pass
+    `keep_connection` when requests will run on this thread, as in the sync
+    worker, and the first request reuses the connection opened here (for
+    CONN_MAX_AGE). The gthread and uvicorn workers serve from other
+    threads, so there the connection is closed again and each request
+    thread still opens its own on first use.
+    """
+    global _worker_ready_at, _first_request_done
+    timings = {}
+    for name, step in (
+        ("database", _warm_database),
+        ("templates", _warm_templates),
+        ("recent_logs", get_recent_logs),
+        ("agent_pool", _warm_agent_pool),
+    ):
+        started = monotonic()
+        try:
+            step()
+        except Exception:
+            logger.warning("warm-up step %s failed", name, exc_info=True)
+        timings[name] = monotonic() - started
+    if not keep_connection:
+        connections.close_all()
+
+    _worker_ready_at = monotonic()
+    _first_request_done = False
+    return timings
+
+
+def _report_first_request(request, started: float) -> None:
+    global _first_request_done
+    _first_request_done = True
+    since_ready = ""
+    if _worker_ready_at is not None:
+        since_ready = f", {started - _worker_ready_at:.3f}s after warm-up"
+    logger.info(
+        "first request %s %s took %.3fs%s",
+        request.method,
+        request.path,
+        monotonic() - started,
+        since_ready,
+    )
+
+
+class FirstRequestTimingMiddleware:
+    """
+    Log how long each worker's first request takes, the one that used to
+    pay for every lazy initialisation. Pass-through after that.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if _first_request_done:
+            return self.get_response(request)
+        started = monotonic()
+        response = self.get_response(request)
+        _report_first_request(request, started)
+        return response
+
+    async def __acall__(self, request):
+        if _first_request_done:
+            return await self.get_response(request)
+        started = monotonic()
+        response = await self.get_response(request)
+        _report_first_request(request, started)
+        return response